@@ -1,33 +1,124 @@
 """Authentication utilities for JWT and password handling."""
+import base64
+import binascii
+import hashlib
+import hmac
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+import jwt
+import orjson
+from cachetools import TLRUCache, TTLCache
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
-from .config import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRY_HOURS
+from .config import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRY_HOURS, CACHE_AUTH, AUTH_PEPPER
 from .database import get_db
 from .models import User
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing - Argon2id (OWASP parameters); bcrypt kept to verify legacy
+# hashes, which are rehashed on the next successful login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    argon2__type="ID",
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1,
+)
 
-# HTTP Bearer token scheme
-security = HTTPBearer(auto_error=False)
+# JWT encode/decode arguments, built once at import
+_DECODE_KWARGS = {
+    "key": JWT_SECRET_KEY,
+    "algorithms": [JWT_ALGORITHM],
+    "options": {"verify_aud": False, "require": ["exp", "sub"]},
+}
+_ENCODE_HEADER = {"alg": JWT_ALGORITHM, "typ": "JWT"}
 
+# Tokens issued by create_access_token all share this exact header segment
+# (PyJWT serializes headers compactly with sorted keys)
+_FAST_HEADER_SEGMENT = base64.urlsafe_b64encode(
+    orjson.dumps(dict(sorted(_ENCODE_HEADER.items())))
+).rstrip(b"=").decode()
+_FAST_KEY = JWT_SECRET_KEY.encode()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash (truncated to 72 bytes for bcrypt)."""
-    return pwd_context.verify(plain_password[:72], hashed_password)
+# Decoded token cache - avoids re-verifying the same JWT on every request.
+# Entries live at most TOKEN_CACHE_TTL seconds and never outlive the token's exp.
+TOKEN_CACHE_TTL = 30
+
+
+def _token_ttu(key, payload: dict, now: float) -> float:
+    """Expire a cached payload after TOKEN_CACHE_TTL seconds or at its exp claim."""
+    return now + min(TOKEN_CACHE_TTL, payload["exp"] - time.time())
+
+
+_token_cache: TLRUCache = TLRUCache(maxsize=10000, ttu=_token_ttu)
+_token_cache_lock = threading.Lock()
+
+# Authenticated user cache - detached User rows keyed by user id
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+_user_cache_lock = threading.Lock()
+
+
+def get_password_fast_hash(password: str) -> Optional[str]:
+    """Derive the peppered HMAC-SHA256 verifier for a password.
+    
+    Returns None when AUTH_PEPPER is not configured - without a server-side
+    secret the verifier would be an unsalted fast hash, so it is never stored.
+    """
+    if not AUTH_PEPPER:
+        return None
+    return hmac.new(AUTH_PEPPER.encode(), password.encode(), hashlib.sha256).hexdigest()
+
+
+def verify_password(
+    plain_password: str,
+    hashed_password: str,
+    fast_hash: Optional[str] = None,
+) -> bool:
+    """Verify a password against its hash.
+    
+    If a fast verifier is stored, it is checked first in constant time and
+    bcrypt only runs on a miss (e.g. rows not yet migrated).
+    
+    This blocks for the full hash cost; from async code use averify_password.
+    """
+    if fast_hash:
+        candidate = get_password_fast_hash(plain_password)
+        if candidate and hmac.compare_digest(candidate, fast_hash):
+            return True
+    # Legacy bcrypt hashes were created from the first 72 bytes only
+    if pwd_context.identify(hashed_password) == "bcrypt":
+        plain_password = plain_password[:72]
+    return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password (truncated to 72 bytes for bcrypt compatibility)."""
-    # bcrypt has a 72 byte limit
-    return pwd_context.hash(password[:72])
+    """Hash a password with Argon2id (blocking; from async code use aget_password_hash)."""
+    return pwd_context.hash(password)
+
+
+async def averify_password(
+    plain_password: str,
+    hashed_password: str,
+    fast_hash: Optional[str] = None,
+) -> bool:
+    """verify_password for async routes - runs in the threadpool, off the event loop."""
+    return await run_in_threadpool(verify_password, plain_password, hashed_password, fast_hash)
+
+
+async def aget_password_hash(password: str) -> str:
+    """get_password_hash for async routes - runs in the threadpool, off the event loop."""
+    return await run_in_threadpool(get_password_hash, password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash uses a deprecated scheme or parameters."""
+    return pwd_context.needs_update(hashed_password)
 
 
 def create_access_token(user_id: int, email: str) -> str:
@@ -38,30 +129,120 @@ def create_access_token(user_id: int, email: str) -> str:
         "email": email,
         "exp": expire,
     }
-    return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+    return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM, headers=_ENCODE_HEADER)
 
 
-def decode_token(token: str) -> Optional[dict]:
-    """Decode and validate a JWT token."""
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+_FALLBACK = object()
+
+
+def _fast_decode(token: str):
+    """Verify an HS256 token issued by create_access_token without PyJWT.
+    
+    Returns the payload, None if the token is invalid, or _FALLBACK when the
+    token has a different header or extra time claims and needs jwt.decode.
+    """
+    if JWT_ALGORITHM != "HS256" or token.count(".") != 2:
+        return _FALLBACK
+    header, payload_segment, signature = token.split(".")
+    if header != _FAST_HEADER_SEGMENT:
+        return _FALLBACK
+    
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        provided = _b64url_decode(signature)
+        payload = orjson.loads(_b64url_decode(payload_segment))
+    except (binascii.Error, ValueError):
+        return None
+    expected = hmac.new(_FAST_KEY, f"{header}.{payload_segment}".encode(), hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, provided):
+        return None
+    
+    if not isinstance(payload, dict) or "nbf" in payload or "iat" in payload:
+        return _FALLBACK
+    exp = payload.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= time.time() or not payload.get("sub"):
+        return None
+    return payload
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """Decode and validate a JWT token (cached for up to TOKEN_CACHE_TTL seconds)."""
+    # Key by a digest so raw tokens are never held in memory
+    cache_key = hashlib.sha256(token.encode()).digest()[:16]
+    with _token_cache_lock:
+        payload = _token_cache.get(cache_key)
+    if payload is not None:
         return payload
-    except JWTError:
+    
+    payload = _fast_decode(token)
+    if payload is _FALLBACK:
+        try:
+            payload = jwt.decode(token, **_DECODE_KWARGS)
+        except jwt.PyJWTError:
+            return None
+    if payload is None:
         return None
+    
+    # Only cache tokens that carry an expiry that is still in the future
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > time.time():
+        with _token_cache_lock:
+            _token_cache[cache_key] = payload
+    return payload
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop a cached user so the next request reloads it from the database."""
+    with _user_cache_lock:
+        _user_cache.pop(int(user_id), None)
+
+
+def _load_user(db: Session, user_id: int) -> Optional[User]:
+    """Load a user by id, serving from the user cache when enabled.
+    
+    Cached users are detached from their session, so only column attributes
+    (id, email, display_name, ...) are safe to read from them.
+    """
+    if CACHE_AUTH:
+        with _user_cache_lock:
+            user = _user_cache.get(user_id)
+        if user is not None:
+            return user
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    
+    if user and CACHE_AUTH:
+        db.expunge(user)
+        with _user_cache_lock:
+            _user_cache[user_id] = user
+    return user
+
+
+def bearer_token(request: Request) -> Optional[str]:
+    """Extract the token from an `Authorization: Bearer <token>` header.
+    
+    A single header lookup instead of HTTPBearer's credentials object.
+    """
+    header = request.headers.get("authorization")
+    if header and header[:7].lower() == "bearer " and header[7:]:
+        return header[7:]
+    return None
 
 
 def get_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    token: Optional[str] = Depends(bearer_token),
     db: Session = Depends(get_db),
 ) -> Optional[User]:
     """
     Get the current authenticated user from the JWT token.
     Returns None if no token or invalid token (allows anonymous access).
     """
-    if not credentials:
+    if not token:
         return None
     
-    token = credentials.credentials
     payload = decode_token(token)
     
     if not payload:
@@ -71,26 +252,24 @@ def get_current_user(
     if not user_id:
         return None
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    return user
+    return _load_user(db, int(user_id))
 
 
 def require_auth(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    token: Optional[str] = Depends(bearer_token),
     db: Session = Depends(get_db),
 ) -> User:
     """
     Require authentication - raises 401 if not authenticated.
     Use this for endpoints that must have a logged-in user.
     """
-    if not credentials:
+    if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    token = credentials.credentials
     payload = decode_token(token)
     
     if not payload:
@@ -108,7 +287,7 @@ def require_auth(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = _load_user(db, int(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
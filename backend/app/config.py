@@ -9,6 +9,7 @@
     For Railway deployment, use environment variables instead.
 """
 import os
+import secrets
 from pathlib import Path
 
 # Base paths - support Railway volumes via environment variables
@@ -36,19 +37,44 @@ EXAM_QUESTION_COUNT = int(os.environ.get("EXAM_QUESTION_COUNT", "60"))
 PASSING_SCORE = int(os.environ.get("PASSING_SCORE", "700"))
 MAX_SCALED_SCORE = 1000
 
-# Ensure directories exist
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-PDFS_DIR.mkdir(parents=True, exist_ok=True)
-EXHIBITS_DIR.mkdir(parents=True, exist_ok=True)
-
 # Domain config path
 DOMAINS_CONFIG_PATH = CONFIG_DIR / "domains.json"
 
 # Server port (Railway provides PORT env var)
 PORT = int(os.environ.get("PORT", "8000"))
 
+# Worker threads for sync routes; each login holds one for the whole password hash
+THREADPOOL_SIZE = int(os.environ.get("THREADPOOL_SIZE", "64"))
+
+# CORS origins, comma-separated. The frontend is same-origin in production and
+# proxied by Vite in development, so this is empty unless another site calls the API.
+ALLOWED_ORIGINS = [o.strip() for o in os.environ.get("ALLOWED_ORIGINS", "").split(",") if o.strip()]
+
+# Railway sets RAILWAY_ENVIRONMENT; ENVIRONMENT=production works elsewhere
+IS_PRODUCTION = bool(os.environ.get("RAILWAY_ENVIRONMENT")) or os.environ.get("ENVIRONMENT") == "production"
+
 # JWT Authentication
-import secrets
-JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", secrets.token_urlsafe(32))
+# A generated key would change on every restart and log everyone out, so
+# production must set one. Local development still gets a throwaway key.
+JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY")
+if not JWT_SECRET_KEY:
+    if IS_PRODUCTION:
+        raise RuntimeError("JWT_SECRET_KEY must be set in production")
+    JWT_SECRET_KEY = secrets.token_urlsafe(32)
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRY_HOURS = int(os.environ.get("JWT_EXPIRY_HOURS", "24"))
+
+# Server-side pepper for the fast password verifier (fast path disabled if unset)
+AUTH_PEPPER = os.environ.get("AUTH_PEPPER")
+
+# Cache authenticated users between requests (set CACHE_AUTH=0 to disable)
+CACHE_AUTH = os.environ.get("CACHE_AUTH", "1") == "1"
+
+
+def ensure_dirs():
+    """Create the data, PDF and exhibit directories if they are missing.
+    
+    Called once at application startup so importing config has no side effects.
+    """
+    for directory in (DATA_DIR, PDFS_DIR, EXHIBITS_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
@@ -1,24 +1,53 @@
 """Database setup and session management."""
-from sqlalchemy import create_engine
+import logging
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 
 from .config import DATABASE_URL
 
 # SQLite requires check_same_thread=False, PostgreSQL doesn't need it
-connect_args = {}
 if DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
+    engine_kwargs = {
+        "connect_args": {"check_same_thread": False, "timeout": 30},
+    }
+    if ":memory:" in DATABASE_URL or DATABASE_URL in ("sqlite://", "sqlite:///"):
+        # An in-memory database only exists on its one connection
+        engine_kwargs["poolclass"] = StaticPool
+else:
+    engine_kwargs = {
+        "pool_size": 20,
+        "max_overflow": 40,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+    if make_url(DATABASE_URL).drivername in ("postgresql", "postgresql+psycopg2"):
+        # executemany UPDATEs (e.g. ORM bulk updates by primary key) go out as
+        # paged execute_batch calls instead of one round trip per row
+        engine_kwargs["executemany_mode"] = "values_plus_batch"
+
+engine = create_engine(DATABASE_URL, echo=False, **engine_kwargs)
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args=connect_args,
-    echo=False
-)
+if DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Use WAL so readers don't block on the writer, plus a larger page cache."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
 
 def get_db():
     """Dependency for getting database sessions."""
@@ -29,7 +58,56 @@ def get_db():
         db.close()
 
 
+def get_session_factory():
+    """Dependency for work that opens its own sessions, e.g. background tasks."""
+    return SessionLocal
+
+
 def init_db():
     """Initialize database tables."""
     from . import models  # noqa: F401
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _backfill_choice_counts()
+    _create_missing_indexes()
+
+
+def _add_missing_columns():
+    """Add columns introduced after a table was first created.
+    
+    create_all() only creates missing tables, so existing databases would
+    otherwise lack newer (nullable or defaulted) columns.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"
+                if column.default is not None and column.default.is_scalar:
+                    ddl += f" DEFAULT {column.default.arg!r}"
+                conn.execute(text(ddl))
+                logger.info(f"Added column {table.name}.{column.name}")
+
+
+def _backfill_choice_counts():
+    """Fill questions.choice_count for rows stored before the column existed."""
+    with engine.begin() as conn:
+        result = conn.execute(text(
+            "UPDATE questions SET choice_count = json_array_length(choices) "
+            "WHERE choice_count IS NULL"
+        ))
+        if result.rowcount:
+            logger.info(f"Backfilled choice_count for {result.rowcount} questions")
+
+
+def _create_missing_indexes():
+    """Create indexes added to models after their table already existed."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
@@ -1,14 +1,33 @@
 """Mount built frontend for production single-service deployment."""
 from pathlib import Path
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from starlette.exceptions import HTTPException
+from starlette.types import Scope
 
+from .static_files import CachedStaticFiles, IMMUTABLE_CACHE_CONTROL
 
-def mount_frontend(app: FastAPI):
+DEFAULT_FRONTEND_DIST = Path(__file__).parent.parent.parent / "frontend" / "dist"
+
+
+class SPAStaticFiles(StaticFiles):
+    """StaticFiles that falls back to index.html for client-side routes."""
+    
+    async def get_response(self, path: str, scope: Scope):
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            # Unknown API/static paths should stay 404s, not render the app
+            if exc.status_code != 404 or path.startswith(("api/", "static/")):
+                raise
+            return await super().get_response("index.html", scope)
+
+
+def mount_frontend(app: FastAPI, frontend_dist: Optional[Path] = None):
     """Mount the built frontend assets and serve SPA for all non-API routes."""
     # Frontend dist is at project_root/frontend/dist
-    frontend_dist = Path(__file__).parent.parent.parent / "frontend" / "dist"
+    frontend_dist = frontend_dist or DEFAULT_FRONTEND_DIST
     
     if not frontend_dist.exists():
         return  # No built frontend, skip (development mode)
@@ -16,20 +35,7 @@ def mount_frontend(app: FastAPI):
     # Mount static assets (JS, CSS, images)
     assets_dir = frontend_dist / "assets"
     if assets_dir.exists():
-        app.mount("/assets", StaticFiles(directory=str(assets_dir)), name="frontend-assets")
+        app.mount("/assets", CachedStaticFiles(directory=str(assets_dir), cache_control=IMMUTABLE_CACHE_CONTROL), name="frontend-assets")
     
-    # Serve index.html for SPA routing (catch-all for non-API routes)
-    @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        """Serve the SPA - return index.html for client-side routing."""
-        # Don't intercept API routes
-        if full_path.startswith("api/") or full_path.startswith("static/"):
-            return None
-        
-        # Check if it's a real file in dist
-        file_path = frontend_dist / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        
-        # Return index.html for SPA routing
-        return FileResponse(frontend_dist / "index.html")
+    # Serve files from dist, and index.html for SPA routing (must be mounted last)
+    app.mount("/", SPAStaticFiles(directory=str(frontend_dist), html=True), name="spa")
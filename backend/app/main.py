@@ -2,15 +2,17 @@
 import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .database import init_db
-from .config import EXHIBITS_DIR, PORT
+from .config import ALLOWED_ORIGINS, EXHIBITS_DIR, PORT, THREADPOOL_SIZE, ensure_dirs
 from .routers import import_router, session, dashboard, auth
 from .frontend_mount import mount_frontend
+from .static_files import CachedStaticFiles, EXHIBIT_CACHE_CONTROL
 
 # Configure logging
 logging.basicConfig(
@@ -24,6 +26,10 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Lifecycle management for the application."""
     # Startup
+    # Sync routes run in anyio's threadpool (default 40); concurrent logins
+    # each hold a thread while hashing, so give them more headroom
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    ensure_dirs()
     logger.info("Initializing database...")
     init_db()
     logger.info("Database initialized")
@@ -37,22 +43,47 @@ app = FastAPI(
     description="Interactive exam simulator with PDF import, progress tracking, and multiple study modes",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware for frontend
-# In production (single service), frontend is served from same origin
-# Allow all origins for flexibility during development and deployment
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# In production (single service), frontend is served from same origin, and the
+# Vite dev server proxies /api, so CORS is only needed for extra origins
+if ALLOWED_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip responses except exhibit images, which are already compressed."""
+    
+    excluded_prefixes = ("/static/exhibits/",)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.excluded_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024)
 
 # Mount static files for exhibit images (from config-based directory)
-if EXHIBITS_DIR.exists():
-    app.mount("/static/exhibits", StaticFiles(directory=str(EXHIBITS_DIR)), name="exhibits")
+# The directory is created in lifespan, so don't require it at import time
+app.mount(
+    "/static/exhibits",
+    CachedStaticFiles(
+        directory=str(EXHIBITS_DIR),
+        check_dir=False,
+        cache_control=EXHIBIT_CACHE_CONTROL,
+    ),
+    name="exhibits",
+)
 
 # Include routers
 app.include_router(auth.router)
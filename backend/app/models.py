@@ -1,13 +1,26 @@
 """SQLAlchemy models for the exam simulator."""
 import json
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from typing import List, Optional, Tuple
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, JSON, Index, inspect
+from sqlalchemy.orm import relationship, validates
 
 from .database import Base
 
 
+def _loaded_dict(instance, keys) -> dict:
+    """Return a mapping holding at least `keys`, read from the instance __dict__.
+    
+    Reading from the dict skips the ORM descriptor on each access. When any
+    of `keys` is expired, deferred or unset, fall back to the descriptors.
+    Columns outside `keys` may stay unloaded (e.g. via load_only).
+    """
+    unloaded = inspect(instance).unloaded
+    if not unloaded or unloaded.isdisjoint(keys):
+        return instance.__dict__
+    return {key: getattr(instance, key) for key in keys}
+
+
 class User(Base):
     """A user account."""
     __tablename__ = "users"
@@ -15,6 +28,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
+    password_fast_hash = Column(String(64), nullable=True)  # HMAC-SHA256 verifier (see auth.py)
     display_name = Column(String(100), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -26,7 +40,7 @@ class User(Base):
             "id": self.id,
             "email": self.email,
             "display_name": self.display_name or self.email.split("@")[0],
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
         }
 
 
@@ -38,6 +52,7 @@ class Question(Base):
     stable_id = Column(String(64), unique=True, index=True)  # Hash-based stable ID
     text = Column(Text, nullable=False)
     choices = Column(JSON, nullable=False)  # List of {"label": "A", "text": "..."}
+    choice_count = Column(Integer, nullable=True, index=True)  # len(choices), so selectors filter in SQL
     correct_answers = Column(JSON, nullable=False)  # List of correct labels ["A"] or ["A", "C"]
     explanation = Column(Text, nullable=True)
     question_type = Column(String(20), default="single")  # single, multi, truefalse, study
@@ -54,29 +69,46 @@ class Question(Base):
     times_shown = Column(Integer, default=0)
     times_correct = Column(Integer, default=0)
     
+    __table_args__ = (
+        # Serves the missed-questions filter (times_shown > times_correct)
+        Index("ix_questions_missed", "times_shown", "times_correct"),
+    )
+    
     @property
     def accuracy(self) -> float:
         if self.times_shown == 0:
             return 0.0
         return self.times_correct / self.times_shown
     
+    @validates("choices")
+    def _sync_choice_count(self, key, choices):
+        self.choice_count = len(choices or [])
+        return choices
+    
+    _DICT_KEYS = (
+        "id", "stable_id", "text", "choices", "question_type", "domain_id",
+        "source_file", "source_page", "exhibit_image", "series_id", "sequence_number",
+    )
+    _ANSWER_KEYS = _DICT_KEYS + ("correct_answers", "explanation")
+    
     def to_dict(self, include_answer: bool = False) -> dict:
+        d = _loaded_dict(self, self._ANSWER_KEYS if include_answer else self._DICT_KEYS)
         result = {
-            "id": self.id,
-            "stable_id": self.stable_id,
-            "text": self.text,
-            "choices": self.choices,
-            "question_type": self.question_type,
-            "domain_id": self.domain_id,
-            "source_file": self.source_file,
-            "source_page": self.source_page,
-            "exhibit_image": self.exhibit_image,
-            "series_id": self.series_id,
-            "sequence_number": self.sequence_number,
+            "id": d["id"],
+            "stable_id": d["stable_id"],
+            "text": d["text"],
+            "choices": d["choices"],
+            "question_type": d["question_type"],
+            "domain_id": d["domain_id"],
+            "source_file": d["source_file"],
+            "source_page": d["source_page"],
+            "exhibit_image": d["exhibit_image"],
+            "series_id": d["series_id"],
+            "sequence_number": d["sequence_number"],
         }
         if include_answer:
-            result["correct_answers"] = self.correct_answers
-            result["explanation"] = self.explanation
+            result["correct_answers"] = d["correct_answers"]
+            result["explanation"] = d["explanation"]
         return result
 
 
@@ -106,18 +138,35 @@ class ExamSession(Base):
     question_ids = Column(JSON, nullable=False)  # Ordered list of question IDs
     answers = Column(JSON, default=dict)  # {question_id: {"selected": ["A"], "flagged": false}}
     
+    # Denormalized from answers by record_answer; NULL on sessions that predate them
+    answered_count = Column(Integer, nullable=True)
+    flagged_count = Column(Integer, nullable=True)
+    
     # Relationships
     user = relationship("User", back_populates="sessions")
     
+    __table_args__ = (
+        # Dashboard lists completed sessions newest first
+        Index("ix_sessions_completed_desc", completed_at.desc()),
+    )
+    
     @property
     def time_remaining_seconds(self) -> Optional[int]:
         """Calculate remaining time in seconds."""
+        return self.remaining_seconds_at()
+    
+    def remaining_seconds_at(self, now: Optional[datetime] = None) -> Optional[int]:
+        """Calculate remaining time in seconds as of `now` (default: utcnow).
+        
+        Untimed and completed sessions return before the clock is read.
+        """
         if not self.time_limit_minutes or not self.started_at:
             return None
         if self.completed_at:
             return 0
         
-        now = datetime.utcnow()
+        if now is None:
+            now = datetime.utcnow()
         elapsed = (now - self.started_at).total_seconds()
         
         # Subtract paused time
@@ -130,6 +179,16 @@ class ExamSession(Base):
         remaining = (self.time_limit_minutes * 60) - elapsed
         return max(0, int(remaining))
     
+    def answer_counts(self) -> Tuple[int, int]:
+        """(answered, flagged) counts, recounted from answers if not yet stored."""
+        if self.answered_count is not None and self.flagged_count is not None:
+            return self.answered_count, self.flagged_count
+        answers = (self.answers or {}).values()
+        return (
+            sum(1 for a in answers if a.get("selected")),
+            sum(1 for a in answers if a.get("flagged")),
+        )
+    
     @property
     def is_paused(self) -> bool:
         return self.paused_at is not None
@@ -139,24 +198,32 @@ class ExamSession(Base):
         remaining = self.time_remaining_seconds
         return remaining is not None and remaining <= 0
     
+    _DICT_KEYS = (
+        "id", "mode", "started_at", "completed_at", "time_limit_minutes", "paused_at",
+        "total_paused_seconds", "total_questions", "correct_count", "percent_score",
+        "scaled_score", "passed", "question_ids", "answers",
+    )
+    
     def to_dict(self) -> dict:
+        d = _loaded_dict(self, self._DICT_KEYS)
+        paused_at = d["paused_at"]
         return {
-            "id": self.id,
-            "mode": self.mode,
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
-            "time_limit_minutes": self.time_limit_minutes,
-            "paused_at": self.paused_at.isoformat() if self.paused_at else None,
-            "total_paused_seconds": self.total_paused_seconds or 0,
-            "is_paused": self.is_paused,
-            "time_remaining_seconds": self.time_remaining_seconds,
-            "total_questions": self.total_questions,
-            "correct_count": self.correct_count,
-            "percent_score": self.percent_score,
-            "scaled_score": self.scaled_score,
-            "passed": self.passed,
-            "question_ids": self.question_ids,
-            "answers": self.answers,
+            "id": d["id"],
+            "mode": d["mode"],
+            "started_at": d["started_at"],
+            "completed_at": d["completed_at"],
+            "time_limit_minutes": d["time_limit_minutes"],
+            "paused_at": paused_at,
+            "total_paused_seconds": d["total_paused_seconds"] or 0,
+            "is_paused": paused_at is not None,
+            "time_remaining_seconds": self.remaining_seconds_at(),
+            "total_questions": d["total_questions"],
+            "correct_count": d["correct_count"],
+            "percent_score": d["percent_score"],
+            "scaled_score": d["scaled_score"],
+            "passed": d["passed"],
+            "question_ids": d["question_ids"],
+            "answers": d["answers"],
         }
 
 
@@ -170,6 +237,23 @@ class ImportRecord(Base):
     imported_at = Column(DateTime, default=datetime.utcnow)
     questions_imported = Column(Integer, default=0)
     status = Column(String(20), default="pending")  # pending, completed, failed
+    
+    __table_args__ = (
+        # Scan/status look up completed imports by (filename, file_hash)
+        Index("ix_import_lookup", "filename", "file_hash", "status"),
+    )
+
+
+class ScanResult(Base):
+    """Parsed questions held between /import/scan and /import/run."""
+    __tablename__ = "scan_results"
+    
+    id = Column(String(32), primary_key=True)  # scan_id returned by /scan
+    status = Column(String(20), default="done")  # running, done, error
+    error = Column(Text, nullable=True)
+    payload = Column(JSON, nullable=False)  # {"demo", "reports", "questions", "summary"}
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
 
 
 class DomainStats(Base):
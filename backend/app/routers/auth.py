@@ -9,12 +9,19 @@ from ..models import User
 from ..auth import (
     verify_password,
     get_password_hash,
+    get_password_fast_hash,
+    password_needs_rehash,
     create_access_token,
+    invalidate_user_cache,
     require_auth,
 )
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
+# Routes that hash or verify passwords are plain `def` so FastAPI runs them in
+# the threadpool. If one becomes `async def`, switch to averify_password /
+# aget_password_hash - calling the sync helpers would stall the event loop.
+
 
 class RegisterRequest(BaseModel):
     email: EmailStr
@@ -62,11 +69,13 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
     user = User(
         email=request.email,
         password_hash=get_password_hash(request.password),
+        password_fast_hash=get_password_fast_hash(request.password),
         display_name=request.display_name,
     )
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_user_cache(user.id)
     
     # Generate token
     token = create_access_token(user.id, user.email)
@@ -89,12 +98,25 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Verify password
-    if not verify_password(request.password, user.password_hash):
+    if not verify_password(request.password, user.password_hash, user.password_fast_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
     
+    # Migrate legacy bcrypt hashes and populate the fast verifier
+    changed = False
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = get_password_hash(request.password)
+        changed = True
+    fast_hash = get_password_fast_hash(request.password)
+    if fast_hash and user.password_fast_hash != fast_hash:
+        user.password_fast_hash = fast_hash
+        changed = True
+    if changed:
+        db.commit()
+        invalidate_user_cache(user.id)
+    
     # Generate token
     token = create_access_token(user.id, user.email)
     
@@ -1,11 +1,13 @@
 """API routes for dashboard and statistics."""
 import csv
 import io
+from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import case, desc, func
 
 from ..database import get_db
 from ..models import Question, ExamSession, DomainStats, User
@@ -15,7 +17,67 @@ from ..auth import get_current_user
 router = APIRouter(prefix="/api", tags=["dashboard"])
 
 
-@router.get("/dashboard")
+class RecentSession(BaseModel):
+    """Summary row for a completed session, read straight from ExamSession."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    date: Optional[datetime] = Field(validation_alias="completed_at")
+    mode: str
+    correct: Optional[int] = Field(validation_alias="correct_count")
+    total: Optional[int] = Field(validation_alias="total_questions")
+    percent_score: float
+    scaled_score: Optional[int]
+    passed: Optional[bool]
+    
+    @field_validator("percent_score", mode="before")
+    @classmethod
+    def _round_percent(cls, value: Optional[float]) -> float:
+        return round(value or 0, 1)
+
+
+class TrendPoint(BaseModel):
+    """Score chart point, read straight from ExamSession."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    session_id: int = Field(validation_alias="id")
+    date: Optional[datetime] = Field(validation_alias="completed_at")
+    scaled_score: Optional[int]
+    passed: Optional[bool]
+    mode: str
+
+
+class DomainRow(BaseModel):
+    """Per-domain stats row."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    domain_id: str
+    domain_name: str
+    total_questions: int
+    total_shown: int
+    total_correct: int
+    accuracy: float
+
+
+class DashboardOverview(BaseModel):
+    total_questions: int
+    exam_questions: int
+    unseen_questions: int
+    seen_questions: int
+    total_sessions: int
+    average_score: int
+    passing_rate: int
+
+
+class DashboardResponse(BaseModel):
+    overview: DashboardOverview
+    recent_sessions: List[RecentSession]
+    weak_domains: List[DomainRow]
+    domain_breakdown: List[DomainRow]
+    trend_data: List[TrendPoint]
+
+
+@router.get("/dashboard", response_model=DashboardResponse)
 def get_dashboard(
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user),
@@ -34,25 +96,36 @@ def get_dashboard(
     if current_user:
         session_query = session_query.filter(ExamSession.user_id == current_user.id)
     
-    # Get last 10 completed sessions
-    recent_sessions = session_query.order_by(
+    # Get last 10 completed sessions (skip the JSON payload columns the
+    # dashboard never reads, so they aren't fetched or parsed)
+    recent_sessions = session_query.options(
+        defer(ExamSession.question_ids),
+        defer(ExamSession.answers),
+    ).order_by(
         desc(ExamSession.completed_at)
     ).limit(10).all()
     
     # Get domain stats
     domain_stats = db.query(DomainStats).all()
-    classifier = get_classifier()
+    name_by_id = get_classifier().name_map
+    domain_breakdown = [
+        DomainRow(
+            domain_id=stat.domain_id,
+            domain_name=name_by_id.get(stat.domain_id, stat.domain_id),
+            total_questions=stat.total_questions,
+            total_shown=stat.total_shown,
+            total_correct=stat.total_correct,
+            accuracy=stat.accuracy,
+        )
+        for stat in domain_stats
+    ]
     
     # Calculate weak domains (accuracy < 70%)
     weak_domains = [
-        {
-            **stat.to_dict(),
-            "domain_name": classifier.get_domain_name(stat.domain_id),
-        }
-        for stat in domain_stats
-        if stat.total_shown > 0 and stat.accuracy < 0.7
+        d for d in domain_breakdown
+        if d.total_shown > 0 and d.accuracy < 0.7
     ]
-    weak_domains.sort(key=lambda x: x["accuracy"])
+    weak_domains.sort(key=lambda d: d.accuracy)
     
     # Calculate overall stats
     # Total includes ALL questions (667)
@@ -69,33 +142,22 @@ def get_dashboard(
         Question.times_shown == 0
     ).count()
     
-    # Build query for completed sessions (filtered by user if authenticated)
-    completed_query = db.query(ExamSession).filter(
+    # Aggregate completed sessions in one query (filtered by user if authenticated)
+    completed_query = db.query(
+        func.count(ExamSession.id),
+        func.avg(func.coalesce(ExamSession.scaled_score, 0)),
+        func.sum(case((ExamSession.passed.is_(True), 1), else_=0)),
+    ).filter(
         ExamSession.completed_at.isnot(None)
     )
     if current_user:
         completed_query = completed_query.filter(ExamSession.user_id == current_user.id)
     
-    total_sessions = completed_query.count()
-    completed_sessions = completed_query.all()
-    
-    avg_score = 0
-    if completed_sessions:
-        avg_score = sum(s.scaled_score or 0 for s in completed_sessions) / len(completed_sessions)
-    
-    # Trend data for chart
-    trend_data = [
-        {
-            "session_id": s.id,
-            "date": s.completed_at.isoformat() if s.completed_at else None,
-            "scaled_score": s.scaled_score,
-            "passed": s.passed,
-            "mode": s.mode,
-        }
-        for s in recent_sessions
-    ]
-    trend_data.reverse()  # Oldest to newest for chart
+    total_sessions, avg_score, passed_count = completed_query.one()
+    avg_score = avg_score or 0
+    passing_rate = round(passed_count / total_sessions * 100) if total_sessions else 0
     
+    # Session rows are serialized straight from the ORM objects
     return {
         "overview": {
             "total_questions": total_questions,
@@ -104,33 +166,12 @@ def get_dashboard(
             "seen_questions": exam_questions - unseen_questions,
             "total_sessions": total_sessions,
             "average_score": round(avg_score),
-            "passing_rate": round(
-                sum(1 for s in completed_sessions if s.passed) / len(completed_sessions) * 100
-                if completed_sessions else 0
-            ),
+            "passing_rate": passing_rate,
         },
-        "recent_sessions": [
-            {
-                "id": s.id,
-                "date": s.completed_at.isoformat() if s.completed_at else None,
-                "mode": s.mode,
-                "correct": s.correct_count,
-                "total": s.total_questions,
-                "percent_score": round(s.percent_score or 0, 1),
-                "scaled_score": s.scaled_score,
-                "passed": s.passed,
-            }
-            for s in recent_sessions
-        ],
+        "recent_sessions": recent_sessions,
         "weak_domains": weak_domains[:5],  # Top 5 weakest
-        "domain_breakdown": [
-            {
-                **stat.to_dict(),
-                "domain_name": classifier.get_domain_name(stat.domain_id),
-            }
-            for stat in domain_stats
-        ],
-        "trend_data": trend_data,
+        "domain_breakdown": domain_breakdown,
+        "trend_data": recent_sessions[::-1],  # Oldest to newest for chart
     }
 
 
@@ -158,40 +199,57 @@ def get_domains(db: Session = Depends(get_db)):
 
 @router.get("/export/missed.csv")
 def export_missed_questions(db: Session = Depends(get_db)):
-    """Export all missed questions to CSV."""
-    # Get questions with incorrect answers
-    questions = db.query(Question).filter(
+    """Export all missed questions to CSV, streamed row by row."""
+    # Select only the emitted columns (question text truncated in SQL)
+    query = db.query(
+        Question.stable_id,
+        func.substr(Question.text, 1, 500),
+        Question.correct_answers,
+        Question.domain_id,
+        Question.times_shown,
+        Question.times_correct,
+        Question.source_page,
+    ).filter(
         Question.times_shown > Question.times_correct,
         Question.times_shown > 0
-    ).all()
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow([
-        "ID", "Question", "Correct Answer(s)", "Domain", 
-        "Times Shown", "Times Correct", "Accuracy %", "Source Page"
-    ])
-    
-    # Data rows
-    for q in questions:
-        writer.writerow([
-            q.stable_id,
-            q.text[:500],  # Truncate long questions
-            ", ".join(q.correct_answers),
-            q.domain_id,
-            q.times_shown,
-            q.times_correct,
-            round(q.accuracy * 100, 1),
-            q.source_page,
-        ])
-    
-    output.seek(0)
+    )
+    
+    def rows():
+        # Reuse one buffer; each row is rendered, yielded, then cleared
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        def flush() -> str:
+            line = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            return line
+        
+        try:
+            writer.writerow([
+                "ID", "Question", "Correct Answer(s)", "Domain", 
+                "Times Shown", "Times Correct", "Accuracy %", "Source Page"
+            ])
+            yield flush()
+            
+            for stable_id, text, correct_answers, domain_id, shown, correct, page in query.yield_per(500):
+                writer.writerow([
+                    stable_id,
+                    text,
+                    ", ".join(correct_answers),
+                    domain_id,
+                    shown,
+                    correct,
+                    round(correct / shown * 100, 1),
+                    page,
+                ])
+                yield flush()
+        finally:
+            # The request-scoped session is reused here after the response starts
+            db.close()
     
     return StreamingResponse(
-        iter([output.getvalue()]),
+        rows(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=missed_questions.csv"}
     )
@@ -200,19 +258,20 @@ def export_missed_questions(db: Session = Depends(get_db)):
 @router.get("/stats/questions")
 def get_question_stats(db: Session = Depends(get_db)):
     """Get statistics about all questions."""
-    total = db.query(Question).count()
-    unseen = db.query(Question).filter(Question.times_shown == 0).count()
+    total, unseen = db.query(
+        func.count(Question.id),
+        func.sum(case((Question.times_shown == 0, 1), else_=0)),
+    ).one()
+    unseen = unseen or 0
     
-    # Group by domain
-    classifier = get_classifier()
+    # Group by domain in SQL
+    name_by_id = get_classifier().name_map
     domain_counts = {}
     
-    questions = db.query(Question).all()
-    for q in questions:
-        domain = q.domain_id or "unknown"
-        if domain not in domain_counts:
-            domain_counts[domain] = 0
-        domain_counts[domain] += 1
+    rows = db.query(Question.domain_id, func.count(Question.id)).group_by(Question.domain_id).all()
+    for domain_id, count in rows:
+        domain = domain_id or "unknown"
+        domain_counts[domain] = domain_counts.get(domain, 0) + count
     
     return {
         "total": total,
@@ -221,7 +280,7 @@ def get_question_stats(db: Session = Depends(get_db)):
         "by_domain": [
             {
                 "domain_id": did,
-                "domain_name": classifier.get_domain_name(did),
+                "domain_name": name_by_id.get(did, did),
                 "count": count,
             }
             for did, count in domain_counts.items()
@@ -1,30 +1,135 @@
 """API routes for PDF import functionality."""
 import json
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_db, get_session_factory
 from ..config import PDFS_DIR
-from ..models import Question, ImportRecord, DomainStats
+from ..models import Question, ImportRecord, DomainStats, ScanResult
 from ..services.parser import PDFParser, ParseReport, ParsedQuestion, get_demo_questions
 from ..services.domain_classifier import get_classifier
 
 router = APIRouter(prefix="/api/import", tags=["import"])
 
-# Store scan results in memory for review before import
-_scan_results: dict = {}
+logger = logging.getLogger(__name__)
+
+# Scan results are stored in the database (not process memory) so /run can be
+# served by a different worker than /scan; unclaimed scans expire after an hour
+SCAN_RESULT_TTL = timedelta(hours=1)
+
+# Rows per multi-row INSERT page during import
+IMPORT_CHUNK_SIZE = 500
+
+# PDF parsing is CPU-bound, so new files are parsed in separate processes
+PARSE_WORKERS = min(os.cpu_count() or 1, 4)
+
+# hashlib releases the GIL while digesting, so uncached PDFs are hashed in threads
+HASH_WORKERS = 8
+
+
+# Shared parser, created on first use (same pattern as get_classifier)
+_parser: Optional[PDFParser] = None
+
+
+def _get_parser() -> PDFParser:
+    """Get or create the PDF parser singleton for this process."""
+    global _parser
+    if _parser is None:
+        _parser = PDFParser()
+    return _parser
+
+
+# File hashes keyed by (path, mtime_ns, size), so unchanged PDFs aren't re-read
+_file_hash_cache: Dict[Tuple[str, int, int], str] = {}
+
+
+def _file_hashes(parser: PDFParser, pdf_paths: List[Path]) -> List[str]:
+    """SHA256 of each PDF in order; cache misses are hashed in parallel.
+    
+    Stays SHA256 because ImportRecord.file_hash values are compared against it.
+    """
+    keys = []
+    for pdf_path in pdf_paths:
+        stat = pdf_path.stat()
+        keys.append((str(pdf_path), stat.st_mtime_ns, stat.st_size))
+    
+    missing = [key for key in keys if key not in _file_hash_cache]
+    if len(missing) == 1:
+        _file_hash_cache[missing[0]] = parser.get_file_hash(Path(missing[0][0]))
+    elif missing:
+        with ThreadPoolExecutor(max_workers=min(HASH_WORKERS, len(missing))) as executor:
+            digests = executor.map(parser.get_file_hash, [Path(key[0]) for key in missing])
+            _file_hash_cache.update(zip(missing, digests))
+    return [_file_hash_cache[key] for key in keys]
+
+
+def _imported_files(db: Session) -> set:
+    """(filename, file_hash) pairs of completed imports, in one query."""
+    return set(db.execute(
+        select(ImportRecord.filename, ImportRecord.file_hash).where(
+            ImportRecord.status == "completed"
+        )
+    ).tuples())
+
+
+def _question_count(db: Session) -> int:
+    """Plain SELECT count(*) FROM questions (Query.count() wraps a subquery)."""
+    return db.scalar(select(func.count()).select_from(Question))
+
+
+def _upsert_insert(db: Session):
+    """Dialect-specific insert() that supports ON CONFLICT (SQLite and PostgreSQL)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+def _parse_pdf_worker(path: str) -> ParseReport:
+    """Parse one PDF; top-level so it can run in a worker process."""
+    return _get_parser().parse_pdf(Path(path))
+
+
+def _parse_pdfs(pdf_paths: List[Path]) -> List[ParseReport]:
+    """Parse PDFs in parallel, returning reports in input order.
+    
+    Several files are spread across processes one file each; a single file
+    is parsed here with its pages split across the workers instead.
+    """
+    if len(pdf_paths) == 1:
+        return [_get_parser().parse_pdf(pdf_paths[0], page_workers=PARSE_WORKERS)]
+    if not pdf_paths or PARSE_WORKERS <= 1:
+        return [_parse_pdf_worker(str(p)) for p in pdf_paths]
+    # spawn rather than fork: the server process has running threads
+    with ProcessPoolExecutor(
+        max_workers=min(PARSE_WORKERS, len(pdf_paths)),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        return list(executor.map(_parse_pdf_worker, [str(p) for p in pdf_paths]))
 
 
 class ScanResponse(BaseModel):
-    files_found: int
-    reports: List[dict]
-    needs_import: bool
-    total_questions: int
-    valid_questions: int
-    issues_summary: dict
+    scan_id: Optional[str] = None
+    status: str = "done"  # running, done, error
+    error: Optional[str] = None
+    files_found: int = 0
+    reports: List[dict] = []
+    needs_import: bool = False
+    total_questions: int = 0
+    valid_questions: int = 0
+    issues_summary: dict = {}
 
 
 class QuestionEdit(BaseModel):
@@ -37,132 +142,240 @@ class QuestionEdit(BaseModel):
 
 
 class ImportRequest(BaseModel):
+    scan_id: Optional[str] = None  # Defaults to the most recent scan
     edits: Optional[List[QuestionEdit]] = None
 
 
+def _scan_payload(
+    demo: bool,
+    questions: List[ParsedQuestion],
+    reports: List[dict],
+    summary: dict,
+) -> dict:
+    return {
+        "demo": demo,
+        "reports": reports,
+        # Shallow: the questions are discarded once the payload is stored
+        "questions": [q.to_dict() for q in questions],
+        "summary": summary,
+    }
+
+
+def _create_scan(db: Session, status: str, payload: dict) -> str:
+    """Store a scan row and return its scan_id (expired scans are purged first)."""
+    now = datetime.utcnow()
+    db.query(ScanResult).filter(ScanResult.expires_at <= now).delete(synchronize_session=False)
+    scan_id = uuid.uuid4().hex
+    db.add(ScanResult(
+        id=scan_id,
+        status=status,
+        payload=payload,
+        created_at=now,
+        expires_at=now + SCAN_RESULT_TTL,
+    ))
+    db.commit()
+    return scan_id
+
+
+def _save_scan(
+    db: Session,
+    demo: bool,
+    questions: List[ParsedQuestion],
+    reports: List[dict],
+    issues_summary: Optional[dict] = None,
+) -> str:
+    """Store completed scan results and return their scan_id."""
+    summary = {
+        "files_found": len(reports),
+        "total_questions": len(questions),
+        "valid_questions": sum(1 for q in questions if q.is_valid),
+        "issues_summary": issues_summary or {},
+    }
+    return _create_scan(db, "done", _scan_payload(demo, questions, reports, summary))
+
+
+def _load_scan(db: Session, scan_id: Optional[str]) -> Optional[ScanResult]:
+    """Fetch a finished, unexpired scan by id, or the most recent one if no id is given."""
+    query = db.query(ScanResult).filter(
+        ScanResult.status == "done",
+        ScanResult.expires_at > datetime.utcnow(),
+    )
+    if scan_id:
+        return query.filter(ScanResult.id == scan_id).first()
+    return query.order_by(ScanResult.created_at.desc()).first()
+
+
+def _scan_questions(scan: ScanResult) -> List[ParsedQuestion]:
+    return [ParsedQuestion(**q) for q in scan.payload.get("questions", [])]
+
+
+def _scan_response(scan: ScanResult) -> ScanResponse:
+    """Build the /scan response from a stored scan."""
+    if scan.status != "done":
+        return ScanResponse(scan_id=scan.id, status=scan.status, error=scan.error)
+    
+    payload = scan.payload
+    summary = payload.get("summary", {})
+    if payload.get("demo"):
+        total = summary.get("total_questions", 0)
+        reports = [{"filename": "demo_questions", "total_questions": total, "valid_questions": total}]
+    else:
+        reports = payload.get("reports", [])
+    return ScanResponse(
+        scan_id=scan.id,
+        files_found=summary.get("files_found", 0),
+        reports=reports,
+        needs_import=bool(reports),
+        total_questions=summary.get("total_questions", 0),
+        valid_questions=summary.get("valid_questions", 0),
+        issues_summary=summary.get("issues_summary", {}),
+    )
+
+
+def _run_scan(
+    session_factory: Callable[[], Session],
+    scan_id: str,
+    new_files: List[Tuple[str, str]],
+    files_found: int,
+):
+    """Parse new PDFs and store the results on the scan row (background task).
+    
+    The request's session is closed by then, so the task opens its own from
+    session_factory.
+    """
+    db = session_factory()
+    try:
+        scan = db.get(ScanResult, scan_id)
+        if not scan:
+            return
+        # Anything failing after the row exists must still finish the scan,
+        # or it stays "running" and the wizard keeps polling
+        try:
+            parsed = _parse_pdfs([Path(path) for path, _ in new_files])
+            
+            reports = []
+            all_questions = []
+            issues_summary = {
+                "missing_answers": 0,
+                "broken_choices": 0,
+                "duplicates": 0,
+            }
+            
+            for (_, file_hash), report in zip(new_files, parsed):
+                reports.append({
+                    **report.to_dict(),
+                    "file_hash": file_hash,
+                    "questions": [
+                        {
+                            "stable_id": q.stable_id,
+                            "text": q.text[:200] + "..." if len(q.text) > 200 else q.text,
+                            "choices_count": len(q.choices),
+                            "has_answer": bool(q.correct_answers),
+                            "domain_id": q.domain_id,
+                            "issues": q.issues,
+                            "source_page": q.source_page,
+                        }
+                        for q in report.questions
+                    ]
+                })
+                
+                all_questions.extend(report.questions)
+                issues_summary["missing_answers"] += report.missing_answers
+                issues_summary["broken_choices"] += report.broken_choices
+                issues_summary["duplicates"] += report.duplicates
+            
+            summary = {
+                "files_found": files_found,
+                "total_questions": sum(r.get("total_questions", 0) for r in reports),
+                "valid_questions": sum(r.get("valid_questions", 0) for r in reports),
+                "issues_summary": issues_summary,
+            }
+            scan.payload = _scan_payload(False, all_questions, reports, summary)
+            scan.status = "done"
+            db.commit()
+        except Exception as e:
+            logger.exception(f"Scan {scan_id} failed")
+            # Discard a half-flushed payload so the error status can commit
+            db.rollback()
+            scan.status = "error"
+            scan.error = str(e)
+            db.commit()
+    finally:
+        db.close()
+
+
 @router.post("/scan", response_model=ScanResponse)
-def scan_pdfs(db: Session = Depends(get_db)):
-    """Scan PDF directory and parse all files."""
-    global _scan_results
+def scan_pdfs(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    session_factory: Callable[[], Session] = Depends(get_session_factory),
+):
+    """Scan PDF directory; new files are parsed in the background.
     
+    Returns a scan_id with status "running" - poll GET /scan/{scan_id} until
+    it is "done", then pass the scan_id to /run.
+    """
     # Find all PDFs
     pdf_files = list(PDFS_DIR.glob("*.pdf"))
     
     if not pdf_files:
         # No PDFs found - check if we should use demo data
-        question_count = db.query(Question).count()
+        question_count = _question_count(db)
         if question_count == 0:
             # Load demo questions
-            _scan_results = {
-                "demo": True,
-                "questions": get_demo_questions()
-            }
-            return ScanResponse(
-                files_found=0,
-                reports=[{"filename": "demo_questions", "total_questions": 5, "valid_questions": 5}],
-                needs_import=True,
-                total_questions=5,
-                valid_questions=5,
-                issues_summary={"info": "No PDFs found. Demo questions available for testing."}
+            scan_id = _save_scan(
+                db,
+                demo=True,
+                questions=get_demo_questions(),
+                reports=[],
+                issues_summary={"info": "No PDFs found. Demo questions available for testing."},
             )
-        return ScanResponse(
-            files_found=0,
-            reports=[],
-            needs_import=False,
-            total_questions=0,
-            valid_questions=0,
-            issues_summary={}
-        )
+            return _scan_response(db.get(ScanResult, scan_id))
+        return ScanResponse()
     
-    parser = PDFParser()
-    reports = []
-    all_questions = []
-    issues_summary = {
-        "missing_answers": 0,
-        "broken_choices": 0,
-        "duplicates": 0,
-    }
+    parser = _get_parser()
     
     # Check which files need importing
-    for pdf_path in pdf_files:
-        file_hash = parser.get_file_hash(pdf_path)
-        
-        # Check if already imported
-        existing = db.query(ImportRecord).filter(
-            ImportRecord.filename == pdf_path.name,
-            ImportRecord.file_hash == file_hash,
-            ImportRecord.status == "completed"
-        ).first()
-        
-        if existing:
+    imported = _imported_files(db)
+    new_files: List[Tuple[str, str]] = []
+    for pdf_path, file_hash in zip(pdf_files, _file_hashes(parser, pdf_files)):
+        if (pdf_path.name, file_hash) in imported:
             continue  # Skip already imported files
-        
-        # Parse the PDF
-        report = parser.parse_pdf(pdf_path)
-        reports.append({
-            **report.to_dict(),
-            "file_hash": file_hash,
-            "questions": [
-                {
-                    "stable_id": q.stable_id,
-                    "text": q.text[:200] + "..." if len(q.text) > 200 else q.text,
-                    "choices_count": len(q.choices),
-                    "has_answer": bool(q.correct_answers),
-                    "domain_id": q.domain_id,
-                    "issues": q.issues,
-                    "source_page": q.source_page,
-                }
-                for q in report.questions
-            ]
-        })
-        
-        all_questions.extend(report.questions)
-        issues_summary["missing_answers"] += report.missing_answers
-        issues_summary["broken_choices"] += report.broken_choices
-        issues_summary["duplicates"] += report.duplicates
+        new_files.append((str(pdf_path), file_hash))
     
-    # Store for later import
-    _scan_results = {
-        "demo": False,
-        "reports": reports,
-        "questions": all_questions,
-    }
-    
-    total_questions = sum(r.get("total_questions", 0) for r in reports)
-    valid_questions = sum(r.get("valid_questions", 0) for r in reports)
-    
-    return ScanResponse(
-        files_found=len(pdf_files),
-        reports=reports,
-        needs_import=len(reports) > 0,
-        total_questions=total_questions,
-        valid_questions=valid_questions,
-        issues_summary=issues_summary,
-    )
+    scan_id = _create_scan(db, "running", {})
+    background_tasks.add_task(_run_scan, session_factory, scan_id, new_files, len(pdf_files))
+    return ScanResponse(scan_id=scan_id, status="running", files_found=len(pdf_files))
+
+
+@router.get("/scan/{scan_id}", response_model=ScanResponse)
+def get_scan(scan_id: str, db: Session = Depends(get_db)):
+    """Get the status (and, once done, the results) of a scan."""
+    scan = db.query(ScanResult).filter(
+        ScanResult.id == scan_id,
+        ScanResult.expires_at > datetime.utcnow(),
+    ).first()
+    if not scan:
+        raise HTTPException(status_code=404, detail="Scan not found or expired")
+    return _scan_response(scan)
 
 
 @router.post("/run")
 def run_import(request: ImportRequest, db: Session = Depends(get_db)):
     """Import scanned questions into the database."""
-    global _scan_results
-    
-    if not _scan_results:
+    scan = _load_scan(db, request.scan_id)
+    if not scan:
         raise HTTPException(status_code=400, detail="No scan results. Run /scan first.")
     
     # Build edit lookup
     edits = {e.stable_id: e for e in (request.edits or [])}
     
     # Get questions to import
-    if _scan_results.get("demo"):
-        questions = _scan_results["questions"]
-    else:
-        questions = _scan_results.get("questions", [])
+    questions = _scan_questions(scan)
     
-    imported = 0
     skipped = 0
     classifier = get_classifier()
-    domain_counts = {}  # Track domain counts in memory to avoid duplicate inserts
-    seen_stable_ids = set()  # Track seen stable_ids to skip duplicates in batch
+    rows = []
     
     for q in questions:
         # Check for edits
@@ -188,157 +401,145 @@ def run_import(request: ImportRequest, db: Session = Depends(get_db)):
             skipped += 1
             continue
         
-        # Check for existing question or duplicate in batch
-        if q.stable_id in seen_stable_ids:
-            skipped += 1
-            continue
-        
-        existing = db.query(Question).filter(
-            Question.stable_id == q.stable_id
-        ).first()
-        
-        if existing:
-            skipped += 1
-            continue
-        
-        seen_stable_ids.add(q.stable_id)
-        
-        # Create question
-        question = Question(
-            stable_id=q.stable_id,
-            text=q.text,
-            choices=q.choices,
-            correct_answers=q.correct_answers,
-            explanation=q.explanation,
-            question_type=q.question_type,
-            domain_id=q.domain_id,
-            source_file=getattr(q, 'source_file', None),
-            source_page=q.source_page,
-            exhibit_image=q.exhibit_image,
-            series_id=q.series_id,
-            sequence_number=q.sequence_number,
+        rows.append({
+            "stable_id": q.stable_id,
+            "text": q.text,
+            "choices": q.choices,
+            "choice_count": len(q.choices),
+            "correct_answers": q.correct_answers,
+            "explanation": q.explanation,
+            "question_type": q.question_type,
+            "domain_id": q.domain_id,
+            "source_file": getattr(q, 'source_file', None),
+            "source_page": q.source_page,
+            "exhibit_image": q.exhibit_image,
+            "series_id": q.series_id,
+            "sequence_number": q.sequence_number,
+        })
+    
+    # Insert new questions; the unique stable_id drops duplicates in SQL and
+    # RETURNING reports only the rows that were actually inserted. Passing the
+    # rows as executemany parameters lets SQLAlchemy's insertmanyvalues split
+    # them into pages that stay under the driver's bound-parameter limit.
+    domain_counts = {}
+    imported = 0
+    if rows:
+        stmt = (
+            _upsert_insert(db)(Question)
+            .on_conflict_do_nothing(index_elements=[Question.stable_id])
+            .returning(Question.domain_id)
         )
-        db.add(question)
-        imported += 1
-        
-        # Track domain counts in memory
-        if q.domain_id:
-            domain_counts[q.domain_id] = domain_counts.get(q.domain_id, 0) + 1
+        result = db.execute(
+            stmt, rows, execution_options={"insertmanyvalues_page_size": IMPORT_CHUNK_SIZE},
+        )
+        for domain_id in result.scalars():
+            imported += 1
+            if domain_id:
+                domain_counts[domain_id] = domain_counts.get(domain_id, 0) + 1
+    skipped += len(rows) - imported
     
-    # Update domain stats after all questions processed
-    for domain_id, count in domain_counts.items():
-        stats = db.query(DomainStats).filter(
-            DomainStats.domain_id == domain_id
-        ).first()
-        
-        if stats:
-            stats.total_questions += count
-        else:
-            stats = DomainStats(
-                domain_id=domain_id,
-                domain_name=classifier.get_domain_name(domain_id),
-                total_questions=count,
-            )
-            db.add(stats)
+    # Update domain stats after all questions processed (one upsert)
+    if domain_counts:
+        upsert = _upsert_insert(db)(DomainStats).values([
+            {
+                "domain_id": domain_id,
+                "domain_name": classifier.get_domain_name(domain_id),
+                "total_questions": count,
+            }
+            for domain_id, count in domain_counts.items()
+        ])
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=[DomainStats.domain_id],
+            set_={"total_questions": DomainStats.total_questions + upsert.excluded.total_questions},
+        ))
     
     # Record imports
-    if not _scan_results.get("demo"):
-        for report in _scan_results.get("reports", []):
-            record = ImportRecord(
-                filename=report["filename"],
-                file_hash=report.get("file_hash", ""),
-                questions_imported=report.get("valid_questions", 0),
-                status="completed"
-            )
-            db.add(record)
+    reports = [] if scan.payload.get("demo") else scan.payload.get("reports", [])
+    if reports:
+        db.execute(insert(ImportRecord), [
+            {
+                "filename": report["filename"],
+                "file_hash": report.get("file_hash", ""),
+                "questions_imported": report.get("valid_questions", 0),
+                "status": "completed",
+            }
+            for report in reports
+        ])
     
+    # Consume the scan in the same transaction as the import
+    db.delete(scan)
     db.commit()
     
-    # Clear scan results
-    _scan_results = {}
-    
     return {
         "imported": imported,
         "skipped": skipped,
-        "total_in_db": db.query(Question).count(),
+        "total_in_db": _question_count(db),
     }
 
 
-def _update_domain_question_count(db: Session, domain_id: str, classifier):
-    """Update or create domain stats."""
-    if not domain_id:
-        return
-    
-    stats = db.query(DomainStats).filter(
-        DomainStats.domain_id == domain_id
-    ).first()
-    
-    if stats:
-        stats.total_questions += 1
-    else:
-        stats = DomainStats(
-            domain_id=domain_id,
-            domain_name=classifier.get_domain_name(domain_id),
-            total_questions=1,
-        )
-        db.add(stats)
-
-
 @router.get("/report")
-def get_import_report(db: Session = Depends(get_db)):
-    """Get the current import report/scan results."""
-    global _scan_results
+def get_import_report(scan_id: Optional[str] = None, db: Session = Depends(get_db)):
+    """Get a scan's report (defaults to the most recent scan)."""
+    scan = _load_scan(db, scan_id)
     
-    if not _scan_results:
+    if not scan:
         return {
             "has_scan": False,
-            "questions_in_db": db.query(Question).count(),
+            "questions_in_db": _question_count(db),
         }
     
-    if _scan_results.get("demo"):
-        return {
-            "has_scan": True,
-            "is_demo": True,
-            "questions": [
-                {
-                    "stable_id": q.stable_id,
-                    "text": q.text,
-                    "choices": q.choices,
-                    "correct_answers": q.correct_answers,
-                    "domain_id": q.domain_id,
-                    "issues": q.issues,
-                }
-                for q in _scan_results["questions"]
-            ],
-        }
+    # Stream the (potentially large) list one item at a time
+    payload = scan.payload
+    if payload.get("demo"):
+        head = {"has_scan": True, "scan_id": scan.id, "is_demo": True}
+        items = (_report_question(q) for q in payload.get("questions", []))
+        return StreamingResponse(_stream_json(head, "questions", items), media_type="application/json")
     
-    return {
+    head = {
         "has_scan": True,
+        "scan_id": scan.id,
         "is_demo": False,
-        "reports": _scan_results.get("reports", []),
-        "questions_count": len(_scan_results.get("questions", [])),
+        "questions_count": len(payload.get("questions", [])),
+    }
+    return StreamingResponse(
+        _stream_json(head, "reports", payload.get("reports", [])),
+        media_type="application/json",
+    )
+
+
+def _report_question(data: dict) -> dict:
+    q = ParsedQuestion(**data)
+    return {
+        "stable_id": q.stable_id,
+        "text": q.text,
+        "choices": q.choices,
+        "correct_answers": q.correct_answers,
+        "domain_id": q.domain_id,
+        "issues": q.issues,
     }
 
 
+def _stream_json(head: dict, key: str, items: Iterable[dict]) -> Iterator[bytes]:
+    """Yield `head` as a JSON object whose `key` array is encoded item by item."""
+    yield orjson.dumps(head)[:-1] + b',"' + key.encode() + b'":['
+    for i, item in enumerate(items):
+        yield (b"," if i else b"") + orjson.dumps(item)
+    yield b"]}"
+
+
 @router.get("/status")
 def get_import_status(db: Session = Depends(get_db)):
     """Check if import is needed."""
-    question_count = db.query(Question).count()
+    question_count = _question_count(db)
     pdf_files = list(PDFS_DIR.glob("*.pdf"))
     
     # Check for new/changed PDFs
-    parser = PDFParser()
+    parser = _get_parser()
     new_files = []
     
-    for pdf_path in pdf_files:
-        file_hash = parser.get_file_hash(pdf_path)
-        existing = db.query(ImportRecord).filter(
-            ImportRecord.filename == pdf_path.name,
-            ImportRecord.file_hash == file_hash,
-            ImportRecord.status == "completed"
-        ).first()
-        
-        if not existing:
+    imported = _imported_files(db)
+    for pdf_path, file_hash in zip(pdf_files, _file_hashes(parser, pdf_files)):
+        if (pdf_path.name, file_hash) not in imported:
             new_files.append(pdf_path.name)
     
     return {
@@ -1,8 +1,9 @@
 """API routes for exam sessions."""
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 
 from ..database import get_db
 from ..models import Question, ExamSession, User
@@ -32,7 +33,9 @@ class SessionResponse(BaseModel):
     current_answers: dict
 
 
-@router.get("/study")
+# Large question payloads are returned as ORJSONResponse directly so FastAPI
+# skips the jsonable_encoder pass; orjson handles the datetimes itself.
+@router.get("/study", response_model=None)
 def get_study_questions(db: Session = Depends(get_db)):
     """Get all study-type questions (DRAG DROP, HOTSPOT) for review."""
     questions = db.query(Question).filter(
@@ -41,7 +44,7 @@ def get_study_questions(db: Session = Depends(get_db)):
     
     seen_count = sum(1 for q in questions if q.times_shown > 0)
     
-    return {
+    return ORJSONResponse({
         "questions": [
             {
                 "id": q.id,
@@ -56,7 +59,7 @@ def get_study_questions(db: Session = Depends(get_db)):
         "total": len(questions),
         "seen": seen_count,
         "unseen": len(questions) - seen_count,
-    }
+    })
 
 
 @router.post("/study/{question_id}/seen")
@@ -118,7 +121,7 @@ def get_session(session_id: int, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/{session_id}/questions")
+@router.get("/{session_id}/questions", response_model=None)
 def get_session_questions(session_id: int, db: Session = Depends(get_db)):
     """Get all questions for a session (only show answers after submission)."""
     session = db.query(ExamSession).filter(ExamSession.id == session_id).first()
@@ -129,23 +132,30 @@ def get_session_questions(session_id: int, db: Session = Depends(get_db)):
     # Only include answers if session is completed (submitted)
     include_answers = session.completed_at is not None
     
+    # Load every question in one query, then emit them in session order
+    query = db.query(Question).filter(Question.id.in_(session.question_ids))
+    if not include_answers:
+        query = query.options(defer(Question.correct_answers), defer(Question.explanation))
+    questions_by_id = {q.id: q for q in query}
+    
+    answers = session.answers or {}
     questions = []
     for qid in session.question_ids:
-        question = db.query(Question).filter(Question.id == qid).first()
+        question = questions_by_id.get(qid)
         if question:
             q_dict = question.to_dict(include_answer=include_answers)
             # Add user's answer if exists
-            answer_data = (session.answers or {}).get(str(qid), {})
+            answer_data = answers.get(str(qid), {})
             q_dict["user_selected"] = answer_data.get("selected", [])
             q_dict["user_flagged"] = answer_data.get("flagged", False)
             questions.append(q_dict)
     
-    return {
+    return ORJSONResponse({
         "session_id": session_id,
         "questions": questions,
         "total": len(questions),
         "is_completed": session.completed_at is not None,
-    }
+    })
 
 
 @router.get("/{session_id}/question/{index}")
@@ -215,7 +225,7 @@ def submit_session(session_id: int, db: Session = Depends(get_db)):
     return results
 
 
-@router.get("/{session_id}/results")
+@router.get("/{session_id}/results", response_model=None)
 def get_session_results(session_id: int, db: Session = Depends(get_db)):
     """Get detailed results for a completed session."""
     service = SessionService(db)
@@ -224,42 +234,55 @@ def get_session_results(session_id: int, db: Session = Depends(get_db)):
     if not results:
         raise HTTPException(status_code=404, detail="Results not found. Session may not be completed.")
     
-    return results
+    return ORJSONResponse(results)
+
+
+_NAVIGATOR_STATUS = {
+    (False, False): "unanswered",
+    (True, False): "answered",
+    (False, True): "flagged",
+    (True, True): "answered_flagged",
+}
 
 
 @router.get("/{session_id}/navigator")
-def get_navigator_status(session_id: int, db: Session = Depends(get_db)):
-    """Get question status for the navigator UI."""
+def get_navigator_status(
+    session_id: int,
+    include_statuses: bool = True,
+    db: Session = Depends(get_db),
+):
+    """Get question status for the navigator UI.
+    
+    Pass include_statuses=false to fetch only the answered/flagged counts.
+    """
     session = db.query(ExamSession).filter(ExamSession.id == session_id).first()
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    statuses = []
-    for i, qid in enumerate(session.question_ids):
-        answer_data = (session.answers or {}).get(str(qid), {})
-        selected = answer_data.get("selected", [])
-        flagged = answer_data.get("flagged", False)
-        
-        status = "unanswered"
-        if selected:
-            status = "answered"
-        if flagged:
-            status = "flagged" if not selected else "answered_flagged"
-        
-        statuses.append({
-            "index": i,
-            "question_id": qid,
-            "status": status,
-        })
-    
-    return {
+    answered_count, flagged_count = session.answer_counts()
+    response = {
         "session_id": session_id,
-        "statuses": statuses,
-        "total": len(statuses),
-        "answered": sum(1 for s in statuses if "answered" in s["status"]),
-        "flagged": sum(1 for s in statuses if "flagged" in s["status"]),
+        "total": len(session.question_ids),
+        "answered": answered_count,
+        "flagged": flagged_count,
     }
+    if not include_statuses:
+        return response
+    
+    # Decode answers once and reduce them to membership sets
+    answers = session.answers or {}
+    answered = {qid for qid, a in answers.items() if a.get("selected")}
+    flagged = {qid for qid, a in answers.items() if a.get("flagged")}
+    response["statuses"] = [
+        {
+            "index": i,
+            "question_id": qid,
+            "status": _NAVIGATOR_STATUS[(str(qid) in answered, str(qid) in flagged)],
+        }
+        for i, qid in enumerate(session.question_ids)
+    ]
+    return response
 
 
 @router.get("/{session_id}/time")
@@ -270,6 +293,7 @@ def get_time_status(session_id: int, db: Session = Depends(get_db)):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    answered_count, flagged_count = session.answer_counts()
     return {
         "session_id": session_id,
         "time_limit_minutes": session.time_limit_minutes,
@@ -277,6 +301,8 @@ def get_time_status(session_id: int, db: Session = Depends(get_db)):
         "is_paused": session.is_paused,
         "is_time_expired": session.is_time_expired,
         "is_completed": session.completed_at is not None,
+        "answered": answered_count,
+        "flagged": flagged_count,
     }
 
 
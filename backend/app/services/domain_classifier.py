@@ -1,10 +1,29 @@
 """Domain classifier using keyword matching."""
-import json
+from bisect import bisect_right
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
+import orjson
+from cachetools import LRUCache
 
 from ..config import DOMAINS_CONFIG_PATH
 
+# Parsed domain configs keyed by (path, mtime_ns), shared by every classifier
+_DOMAINS_CACHE: Dict[Tuple[str, int], dict] = {}
+
+
+def _read_config(path: Path) -> Optional[dict]:
+    """Parse the domains config, reusing the cached parse while the file is unchanged."""
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    key = (str(path), mtime_ns)
+    config = _DOMAINS_CACHE.get(key)
+    if config is None:
+        config = orjson.loads(path.read_bytes())
+        _DOMAINS_CACHE[key] = config
+    return config
+
 
 class DomainClassifier:
     """Classifies questions into AZ-104 domains based on keywords."""
@@ -12,15 +31,40 @@ class DomainClassifier:
     def __init__(self):
         self.domains: List[Dict] = []
         self.default_domain: str = "identity-governance"
+        self._domain_order: List[str] = []
+        self._keyword_domains: List[Tuple[str, Tuple[str, ...]]] = []
+        self._name_by_id: Dict[str, str] = {}
+        self._domain_ids: set = set()
+        # Exam PDFs repeat questions, so batch results are kept per exact text
+        self._batch_cache: LRUCache = LRUCache(maxsize=4096)
         self._load_config()
     
     def _load_config(self):
         """Load domain configuration from JSON file."""
-        if DOMAINS_CONFIG_PATH.exists():
-            with open(DOMAINS_CONFIG_PATH, 'r') as f:
-                config = json.load(f)
-                self.domains = config.get("domains", [])
-                self.default_domain = config.get("default_domain", "identity-governance")
+        config = _read_config(DOMAINS_CONFIG_PATH)
+        if config is not None:
+            self.domains = config.get("domains", [])
+            self.default_domain = config.get("default_domain", "identity-governance")
+        self._name_by_id = {d["id"]: d["name"] for d in self.domains}
+        self._domain_ids = set(self._name_by_id)
+        self._build_keyword_index()
+    
+    def _build_keyword_index(self):
+        """Map each distinct lowercased keyword to the domains that list it.
+        
+        Keywords shared by several domains (e.g. "container") are then
+        searched for once per question instead of once per domain.
+        Plain substring checks are kept over a compiled regex alternation:
+        an alternation reports one match per position, so overlapping
+        keywords ("policy", "backup policy") would stop scoring
+        independently, and it measured slower on this keyword set.
+        """
+        self._domain_order = [d["id"] for d in self.domains]
+        keyword_domains: Dict[str, List[str]] = {}
+        for domain in self.domains:
+            for kw in domain.get("keywords", []):
+                keyword_domains.setdefault(kw.lower(), []).append(domain["id"])
+        self._keyword_domains = [(kw, tuple(ids)) for kw, ids in keyword_domains.items()]
     
     def classify(self, text: str) -> str:
         """
@@ -31,13 +75,13 @@ class DomainClassifier:
             return self.default_domain
         
         text_lower = text.lower()
-        scores = {}
+        # Domains in config order, so ties resolve to the first-listed domain
+        scores = dict.fromkeys(self._domain_order, 0)
         
-        for domain in self.domains:
-            domain_id = domain["id"]
-            keywords = domain.get("keywords", [])
-            score = sum(1 for kw in keywords if kw in text_lower)
-            scores[domain_id] = score
+        for kw, domain_ids in self._keyword_domains:
+            if kw in text_lower:
+                for domain_id in domain_ids:
+                    scores[domain_id] += 1
         
         # Return domain with highest score, or default if no matches
         if scores:
@@ -47,12 +91,80 @@ class DomainClassifier:
         
         return self.default_domain
     
+    def classify_batch(self, texts: List[str]) -> List[str]:
+        """Classify many texts at once; same results as classify() per text.
+        
+        Texts seen in an earlier batch (or twice in this one) are only
+        scored once.
+        """
+        known: Dict[str, str] = {}
+        for text in texts:
+            if text not in known:
+                domain_id = self._batch_cache.get(text)
+                if domain_id is not None:
+                    known[text] = domain_id
+        pending = [text for text in dict.fromkeys(texts) if text not in known]
+        if pending:
+            scored = dict(zip(pending, self._score_batch(pending)))
+            self._batch_cache.update(scored)
+            known.update(scored)
+        return [known[text] for text in texts]
+    
+    def _score_batch(self, texts: List[str]) -> List[str]:
+        """Classify texts with one keyword scan over their joined text.
+        
+        The texts are joined into one lowercased buffer, and each keyword is
+        located with str.find over the whole buffer. Python-level work then
+        scales with keywords plus hits rather than texts times keywords.
+        """
+        # Offsets come from the lowercased texts: lower() can change a text's
+        # length (e.g. "İ" becomes two characters)
+        lowered = [(text or "").lower() for text in texts]
+        starts = []
+        offset = 0
+        for text in lowered:
+            starts.append(offset)
+            offset += len(text) + 1
+        # NUL never occurs in a keyword, so matches can't span two texts
+        buffer = "\0".join(lowered)
+        
+        scores: Dict[int, Dict[str, int]] = {}
+        for kw, domain_ids in self._keyword_domains:
+            pos = buffer.find(kw)
+            while pos != -1:
+                i = bisect_right(starts, pos) - 1
+                text_scores = scores.get(i)
+                if text_scores is None:
+                    text_scores = scores[i] = dict.fromkeys(self._domain_order, 0)
+                for domain_id in domain_ids:
+                    text_scores[domain_id] += 1
+                # A keyword scores once per text, so resume at the next text
+                next_start = starts[i + 1] if i + 1 < len(starts) else len(buffer)
+                pos = buffer.find(kw, next_start)
+        
+        results = []
+        for i in range(len(texts)):
+            text_scores = scores.get(i)
+            if text_scores:
+                best = max(text_scores, key=text_scores.get)
+                if text_scores[best] > 0:
+                    results.append(best)
+                    continue
+            results.append(self.default_domain)
+        return results
+    
     def get_domain_name(self, domain_id: str) -> str:
         """Get the human-readable name for a domain."""
-        for domain in self.domains:
-            if domain["id"] == domain_id:
-                return domain["name"]
-        return domain_id
+        return self._name_by_id.get(domain_id, domain_id)
+    
+    def is_known_domain(self, domain_id: str) -> bool:
+        """Check whether domain_id is defined in the config."""
+        return domain_id in self._domain_ids
+    
+    @property
+    def name_map(self) -> Dict[str, str]:
+        """Mapping of domain_id to human-readable name, built at load time."""
+        return self._name_by_id
     
     def get_all_domains(self) -> List[Dict]:
         """Get all domain definitions."""
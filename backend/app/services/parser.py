@@ -1,9 +1,14 @@
 """PDF parser for extracting AZ-104 exam questions."""
 import hashlib
 import logging
+import multiprocessing
 import re
 import io
+import string
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from PIL import Image
@@ -13,9 +18,17 @@ from ..config import EXHIBITS_DIR
 
 logger = logging.getLogger(__name__)
 
+# Page-parallel extraction only pays off once each worker gets a few pages
+MIN_PAGES_PER_WORKER = 8
 
-@dataclass
-class ParsedQuestion:
+
+class _StableIdSlot:
+    """Slot for ParsedQuestion's cached stable_id, kept out of its fields (and asdict)."""
+    __slots__ = ("_stable_id",)
+
+
+@dataclass(slots=True)
+class ParsedQuestion(_StableIdSlot):
     """A question extracted from PDF."""
     text: str
     choices: List[Dict[str, str]]  # [{"label": "A", "text": "..."}]
@@ -29,11 +42,40 @@ class ParsedQuestion:
     sequence_number: int = 0  # Original PDF order
     issues: List[str] = field(default_factory=list)
     
+    def __setattr__(self, name, value):
+        # Edits to the hashed content invalidate the cached stable_id.
+        # object.__setattr__: zero-arg super() breaks in slots dataclasses
+        if name in ("text", "choices"):
+            object.__setattr__(self, "_stable_id", None)
+        object.__setattr__(self, name, value)
+    
     @property
     def stable_id(self) -> str:
-        """Generate a stable ID based on question content."""
-        content = f"{self.text}|{'|'.join(c['text'] for c in self.choices)}"
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+        """Generate a stable ID based on question content (computed once).
+        
+        Must stay the SHA-256 prefix: it is the dedup key for questions
+        already imported and is embedded in exhibit filenames.
+        """
+        if self._stable_id is None:
+            content = f"{self.text}|{'|'.join(c['text'] for c in self.choices)}"
+            self._stable_id = hashlib.sha256(content.encode()).hexdigest()[:16]
+        return self._stable_id
+    
+    def to_dict(self) -> dict:
+        """Field values as a dict, like asdict() but without deep-copying choices."""
+        return {
+            "text": self.text,
+            "choices": self.choices,
+            "correct_answers": self.correct_answers,
+            "explanation": self.explanation,
+            "question_type": self.question_type,
+            "domain_id": self.domain_id,
+            "source_page": self.source_page,
+            "exhibit_image": self.exhibit_image,
+            "series_id": self.series_id,
+            "sequence_number": self.sequence_number,
+            "issues": self.issues,
+        }
     
     @property
     def is_valid(self) -> bool:
@@ -44,7 +86,7 @@ class ParsedQuestion:
         return bool(self.text and self.choices and self.correct_answers)
 
 
-@dataclass
+@dataclass(slots=True)
 class ParseReport:
     """Report of PDF parsing results."""
     filename: str
@@ -68,6 +110,100 @@ class ParseReport:
         }
 
 
+def _chained_word_fixes(fixes: List[Tuple[str, str]]) -> Dict[str, str]:
+    """Map each concatenated word (lowercased) to its fix, including chains.
+    
+    Applying the fixes one after another also repairs chains such as
+    "doyouneed" (doyou, then youneed). Chains are added as their own entries,
+    mapped to what the sequential passes produce, so a single leftmost-longest
+    pass gives the same result.
+    """
+    compiled = [(re.compile(re.escape(word), re.IGNORECASE), fix) for word, fix in fixes]
+    
+    def apply_in_order(text: str) -> str:
+        for pattern, fix in compiled:
+            text = pattern.sub(fix, text)
+        return text
+    
+    words = [word.lower() for word, _ in fixes]
+    fixed = {word: apply_in_order(word) for word in words}
+    pending = list(fixed)
+    while pending:
+        key = pending.pop()
+        tail = fixed[key].split()[-1].lower()
+        for word in words:
+            if word != tail and word.startswith(tail):
+                chained = key + word[len(tail):]
+                if chained not in fixed:
+                    fixed[chained] = apply_in_order(chained)
+                    pending.append(chained)
+    return fixed
+
+
+# Lowercases ASCII only, so offsets in the result line up with the input
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _replace_words(text: str, fixes: Dict[str, str], words: List[str]) -> str:
+    """Replace the lowercase keys of fixes in text, ignoring ASCII case.
+    
+    words are the keys ordered shortest first. Each is located with
+    str.find, then the leftmost, longest hits are replaced without
+    overlapping, as an alternation regex would. That is a handful of
+    C-level scans plus work per hit, instead of the regex engine trying
+    the alternation at every position.
+    """
+    # str.lower() is only offset-safe (and much faster) on ASCII text
+    lowered = text.lower() if text.isascii() else text.translate(_ASCII_LOWER)
+    longest: Dict[int, str] = {}
+    for word in words:
+        pos = lowered.find(word)
+        while pos != -1:
+            longest[pos] = word  # later words are longer
+            pos = lowered.find(word, pos + 1)
+    if not longest:
+        return text
+    
+    parts = []
+    end = 0
+    for start in sorted(longest):
+        if start < end:
+            continue
+        word = longest[start]
+        parts.append(text[end:start])
+        parts.append(fixes[word])
+        end = start + len(word)
+    parts.append(text[end:])
+    return ''.join(parts)
+
+
+def _extract_page_range(filepath: str, start: int, stop: int) -> Dict[int, str]:
+    """Extract pages [start, stop) with PyMuPDF; top-level so it can run in a worker process."""
+    import fitz  # PyMuPDF
+    with fitz.open(filepath) as doc:
+        return PDFParser()._extract_fitz_pages(doc, range(start, stop))
+
+
+def score_exhibit_image(size: int, width: int, height: int, expects_table: bool, on_matched_page: bool) -> float:
+    """Exhibit candidate score; higher wins. Shared with scripts/reextract_images.py."""
+    # Table-like images (wide, short)
+    table_like = width > 300 and height > 50 and width / max(height, 1) > 1.5
+    
+    # Base score from size (prefer larger)
+    score = size / 10000.0
+    
+    # Strongly prefer table-like when table is expected
+    if expects_table and table_like:
+        score += 5.0
+    elif table_like:
+        score += 1.0
+    
+    # Slightly prefer images on the matched page
+    if on_matched_page:
+        score += 0.5
+    return score
+
+
 class PDFParser:
     """Parser for extracting questions from AZ-104 exam PDFs."""
     
@@ -95,6 +231,138 @@ class PDFParser:
         re.IGNORECASE | re.DOTALL
     )
     
+    # Patterns used by the helpers below, compiled once per process
+    WHITESPACE_RE = re.compile(r'\s+')
+    TABLE_ANCHOR_PATTERNS = [
+        re.compile(r'(following\s+(?:users|resources|virtual machines|storage accounts|subscriptions)[^:]*:)', re.IGNORECASE),
+        re.compile(r'(contains\s+the\s+following[^:]*:)', re.IGNORECASE),
+        re.compile(r'(shown\s+in\s+the\s+following[^:]*:)', re.IGNORECASE),
+    ]
+    BLOCK_SPLIT_PATTERNS = [
+        re.compile(r'(?=^Q\d+\n)', re.MULTILINE),
+        re.compile(r'(?=QUESTION\s*(?:NO)?[:\.]?\s*\d+)', re.IGNORECASE),
+        re.compile(r'(?=^\d+[\.\)]\s+)', re.MULTILINE),
+    ]
+    Q_NUMBER_RE = re.compile(r'Q(\d+)')  # used with match(), i.e. at the block start
+    STUDY_CLEANUP_SUBS = [
+        (re.compile(r'^DRAGDROP\s*', re.IGNORECASE), ''),
+        (re.compile(r'^HOTSPOT\s*', re.IGNORECASE), ''),
+        (re.compile(r'Select and Place[:\s]*', re.IGNORECASE), ''),
+        (re.compile(r'Hot Area[:\s]*', re.IGNORECASE), ''),
+        (re.compile(r'Answer by dragging.*?answer area\.?', re.IGNORECASE), ''),
+        (re.compile(r'To answer,.*?answer area\.?', re.IGNORECASE), ''),
+        (re.compile(r'NOTE:.*?point\.?', re.IGNORECASE), ''),
+        # Embedded "Answer: Explanation:" text that appears in the question
+        (re.compile(r'Answer:\s*Explanation:.*$', re.IGNORECASE | re.DOTALL), ''),
+        (re.compile(r'\?\s*Answer:.*$', re.IGNORECASE | re.DOTALL), '?'),
+    ]
+    STUDY_EXPLANATION_RE = re.compile(r'Explanation[:\s]+([A-Z][^Q]+?)(?=Q\d+|$)', re.DOTALL)
+    REFERENCE_URL_RE = re.compile(r'Reference[:\s]*(https?://[^\s]+)', re.IGNORECASE)
+    Q_HEADER_RE = re.compile(r'^Q\d+\n', re.MULTILINE)
+    QUESTION_HEADER_RE = re.compile(r'^QUESTION\s*(?:NO)?[:\.]?\s*\d+[:\.\s]*', re.IGNORECASE)
+    CHOICE_START_RE = re.compile(r'^[A-F][\.\)]', re.MULTILINE)
+    # " A." or " A)", also at the start or after punctuation; a lookbehind so
+    # adjacent markers ("A.B.") don't consume each other's leading character
+    CHOICE_MARKER_RE = re.compile(r'(?:^|(?<=[\s.!?]))([A-F])[\.\)]')
+    CHOICE_END_RE = re.compile(r'\b(?:Answers?:|Explanation:|Reference:|Correct\s+Answer|Q\d+)', re.IGNORECASE)
+    ANSWER_LETTER_RE = re.compile(r'[A-F]')
+    SECTION_START_RE = re.compile(
+        r'^(Note:|Solution:|After you|You |Your |From |To answer|Each |Some |Does |What |Which |How )',
+        re.IGNORECASE
+    )
+    # First pass of _fix_word_spacing: spacing around case changes and punctuation.
+    # Entries with a trigger character are skipped when the text lacks it.
+    SPACING_SUBS = [
+        (None, re.compile(r'([a-z])([A-Z])'), r'\1 \2'),
+        (None, re.compile(r'([.!?,:;])([A-Za-z])'), r'\1 \2'),
+        ('(', re.compile(r'([a-zA-Z])\('), r'\1 ('),
+        (')', re.compile(r'\)([a-zA-Z])'), r') \1'),
+    ]
+    # Common abbreviations used in exam questions, matched as whole words
+    ABBREVIATIONS = {
+        'qis': 'question is',
+        'qin': 'question in',
+        'qs': 'questions',
+        'qsets': 'question sets',
+        'qset': 'question set',
+    }
+    ABBREVIATION_RE = re.compile(r'\b(?:' + '|'.join(ABBREVIATIONS) + r')\b', re.IGNORECASE)
+    # Common multi-word patterns (only for truly concatenated words), in the
+    # order they were historically applied; see _chained_word_fixes
+    CONCATENATIONS = [
+        ('Youhave', 'You have'),
+        ('Youneed', 'You need'),
+        ('Youare', 'You are'),
+        ('Youplan', 'You plan'),
+        ('Youwant', 'You want'),
+        ('Whatshould', 'What should'),
+        ('Whichof', 'Which of'),
+        ('tothe', 'to the'),
+        ('ofthe', 'of the'),
+        ('inthe', 'in the'),
+        ('onthe', 'on the'),
+        ('fromthe', 'from the'),
+        ('allthe', 'all the'),
+        ('thatthe', 'that the'),
+        ('isthe', 'is the'),
+        ('forthe', 'for the'),
+        ('andthe', 'and the'),
+        ('thata', 'that a'),
+        ('tocreate', 'to create'),
+        ('toensure', 'to ensure'),
+        ('tomake', 'to make'),
+        ('toreference', 'to reference'),
+        ('todeploy', 'to deploy'),
+        ('toachieve', 'to achieve'),
+        ('shouldyou', 'should you'),
+        ('doyou', 'do you'),
+        ('canyou', 'can you'),
+    ]
+    CONCATENATION_FIXES = _chained_word_fixes(CONCATENATIONS)
+    CONCATENATION_WORDS = sorted(CONCATENATION_FIXES, key=len)
+    SERIES_MARKER_PATTERNS = [
+        re.compile(pattern, re.IGNORECASE)
+        for pattern in [
+            r"note:\s*this question is part of a series",
+            r"note:\s*the question is included in a number of questions",
+            r"part of a series of questions",
+            r"identical set-up",
+            r"depicts the identical",
+            r"same scenario",
+            r"questions that share the same",
+            r"questions that present the same scenario",
+        ]
+    ]
+    # Track which questions reference exhibits ("exhibit" first: it's the common
+    # hit and also covers "following exhibit")
+    EXHIBIT_KEYWORDS = (
+        "exhibit", "shown in the following", "as shown in",
+        "following diagram", "following image", "shown below"
+    )
+    # Keywords that suggest tabular data is expected
+    TABLE_KEYWORDS = (
+        "following users", "following resources", "following table",
+        "following virtual machines", "following storage accounts",
+        "following subscriptions", "contains the following",
+        "following information", "following configuration",
+        "following azure", "following settings", "following locations"
+    )
+    # Every keyword above contains one of these, so texts without any skip both scans
+    EXHIBIT_HINT_WORDS = ("exhibit", "following", "shown")
+    # Images smaller than this (in extracted bytes) are icons/logos
+    MIN_IMAGE_BYTES = 5000
+    SCENARIO_NOTE_RE = re.compile(r'^Note:.*?(?=You have|You are|Your company|A company)', re.IGNORECASE | re.DOTALL)
+    SCENARIO_WARNING_RE = re.compile(
+        r'After you answer a question in this section.*?review screen\.?\s*',
+        re.IGNORECASE | re.DOTALL
+    )
+    SCENARIO_SOLUTION_RE = re.compile(r'Solution:|Does that meet|What should you', re.IGNORECASE)
+    SCENARIO_WORDING_SUBS = [
+        (re.compile(r"Your company's Azure solution", re.IGNORECASE), "Your company"),
+        (re.compile(r"Your company's", re.IGNORECASE), "Your company"),
+        (re.compile(r"makes use of", re.IGNORECASE), "uses"),
+    ]
+    
     def __init__(self, exhibits_dir: Optional[Path] = None):
         self.classifier = get_classifier()
         # Use config EXHIBITS_DIR (supports Railway volumes)
@@ -103,31 +371,34 @@ class PDFParser:
         else:
             self.exhibits_dir = exhibits_dir
         self.exhibits_dir.mkdir(parents=True, exist_ok=True)
+        # The fixups are pure, and series questions repeat whole scenario
+        # paragraphs and choices, so each distinct text is only fixed once
+        self._fix_word_spacing = lru_cache(maxsize=4096)(self._fix_word_spacing)
     
     def get_file_hash(self, filepath: Path) -> str:
         """Calculate SHA256 hash of file."""
-        sha256 = hashlib.sha256()
         with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+            return hashlib.file_digest(f, "sha256").hexdigest()
     
-    def parse_pdf(self, filepath: Path) -> ParseReport:
-        """Parse a PDF file and extract questions."""
+    def parse_pdf(self, filepath: Path, page_workers: int = 1) -> ParseReport:
+        """Parse a PDF file and extract questions.
+        
+        page_workers > 1 splits PyMuPDF text/table extraction of long PDFs
+        across that many processes.
+        """
         report = ParseReport(filename=filepath.name)
         
         try:
-            text_by_page = self._extract_text(filepath)
+            text_by_page = self._extract_text(filepath, page_workers)
         except Exception as e:
             logger.error(f"Failed to extract text from {filepath}: {e}")
             report.page_issues[0] = [f"Failed to read PDF: {str(e)}"]
             return report
         
-        # Combine all text for processing
-        full_text = "\n".join(text_by_page.values())
-        
-        # Extract questions
-        questions = self._parse_questions(full_text, text_by_page)
+        # Extract questions from the combined text. Blocks can span pages and
+        # the split pattern is chosen per document, so pages aren't split
+        # separately; the joined copy is just not kept past this call
+        questions = self._parse_questions("\n".join(text_by_page.values()), text_by_page)
         
         # Extract images from PDF and link to questions
         self._extract_and_link_images(filepath, questions, text_by_page)
@@ -135,17 +406,15 @@ class PDFParser:
         # Detect question series and assign IDs
         self._detect_question_series(questions)
         
-        # Assign sequence numbers
-        for idx, q in enumerate(questions, 1):
-            q.sequence_number = idx
-        
-        # Classify domains and track stats
+        # Assign sequence numbers, classify domains and track stats in one pass
+        domain_ids = self.classifier.classify_batch([q.text for q in questions])
         seen_ids = set()
-        for q in questions:
-            report.total_questions += 1
+        report.total_questions = len(questions)
+        for idx, (q, domain_id) in enumerate(zip(questions, domain_ids), 1):
+            q.sequence_number = idx
             
             # Classify domain
-            q.domain_id = self.classifier.classify(q.text)
+            q.domain_id = domain_id
             
             # Check for issues (skip for study questions)
             if q.question_type != "study":
@@ -174,12 +443,11 @@ class PDFParser:
             
             if q.is_valid:
                 report.valid_questions += 1
-            
-            report.questions.append(q)
         
+        report.questions = questions
         return report
     
-    def _extract_text(self, filepath: Path) -> Dict[int, str]:
+    def _extract_text(self, filepath: Path, page_workers: int = 1) -> Dict[int, str]:
         """Extract text from PDF using PyMuPDF for better word spacing."""
         text_by_page = {}
         
@@ -187,18 +455,15 @@ class PDFParser:
         try:
             import fitz  # PyMuPDF
             doc = fitz.open(filepath)
-            for i, page in enumerate(doc, 1):
-                # Extract tables first
-                tables_text = self._extract_tables_from_page(page)
-                
-                # Use "text" mode which preserves word spacing better
-                text = page.get_text("text", sort=True)
-                
-                # Insert table text at appropriate locations
-                if tables_text:
-                    text = self._merge_tables_with_text(text, tables_text)
-                
-                text_by_page[i] = text
+            page_count = len(doc)
+            workers = min(page_workers, page_count // MIN_PAGES_PER_WORKER)
+            if workers > 1:
+                try:
+                    text_by_page = self._extract_fitz_parallel(filepath, page_count, workers)
+                except Exception as e:
+                    logger.warning(f"Parallel page extraction failed: {e}, extracting sequentially")
+            if not text_by_page:
+                text_by_page = self._extract_fitz_pages(doc, range(page_count))
             doc.close()
             if text_by_page:
                 return text_by_page
@@ -231,10 +496,55 @@ class PDFParser:
         except Exception as e:
             raise RuntimeError(f"Failed to extract text with pdfplumber: {e}")
     
+    def _extract_fitz_pages(self, doc, page_indexes) -> Dict[int, str]:
+        """Extract text (with tables merged in) for 0-based page indexes, keyed 1-based."""
+        text_by_page = {}
+        for index in page_indexes:
+            page = doc[index]
+            # Extract tables first
+            tables_text = self._extract_tables_from_page(page)
+            
+            # Use "text" mode which preserves word spacing better
+            text = page.get_text("text", sort=True)
+            
+            # Insert table text at appropriate locations
+            if tables_text:
+                text = self._merge_tables_with_text(text, tables_text)
+            
+            text_by_page[index + 1] = text
+        return text_by_page
+    
+    def _extract_fitz_parallel(self, filepath: Path, page_count: int, workers: int) -> Dict[int, str]:
+        """Extract contiguous page ranges in separate processes.
+        
+        PyMuPDF holds the GIL and find_tables() is mostly Python, so threads
+        don't help; each process opens its own copy of the document.
+        """
+        bounds = [page_count * i // workers for i in range(workers + 1)]
+        # spawn rather than fork: the server process has running threads
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            chunks = executor.map(
+                _extract_page_range,
+                [str(filepath)] * workers,
+                bounds[:-1],
+                bounds[1:],
+            )
+            text_by_page = {}
+            for chunk in chunks:
+                text_by_page.update(chunk)
+        return text_by_page
+    
     def _extract_tables_from_page(self, page) -> List[str]:
         """Extract tables from a PyMuPDF page and format as text."""
         tables_text = []
         try:
+            # find_tables() builds table edges only from vector drawings, so
+            # skip its costly analysis on pages without any
+            if not page.get_cdrawings():
+                return tables_text
             # PyMuPDF 1.23+ has find_tables()
             tabs = page.find_tables()
             for tab in tabs:
@@ -324,14 +634,8 @@ class PDFParser:
         table_section = "\n\n" + "\n\n".join(tables_text)
         
         # Try to find a good insertion point (after "following" mentions tables)
-        patterns = [
-            r'(following\s+(?:users|resources|virtual machines|storage accounts|subscriptions)[^:]*:)',
-            r'(contains\s+the\s+following[^:]*:)',
-            r'(shown\s+in\s+the\s+following[^:]*:)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.TABLE_ANCHOR_PATTERNS:
+            match = pattern.search(text)
             if match:
                 insert_pos = match.end()
                 return text[:insert_pos] + table_section + text[insert_pos:]
@@ -362,30 +666,34 @@ class PDFParser:
     
     def _split_into_blocks(self, text: str) -> List[str]:
         """Split text into question blocks."""
-        # Try splitting by Q1, Q2 format first (common in exam PDFs)
-        blocks = re.split(r'(?=^Q\d+\n)', text, flags=re.MULTILINE)
-        
+        # Try Q1, Q2 format first (common in exam PDFs), then QUESTION
+        # markers, then numbered questions
+        q_split, question_split, numbered_split = self.BLOCK_SPLIT_PATTERNS
+        blocks = []
+        # Substring probes skip full-text scans that can't match; non-ASCII
+        # text may case-fold into "QUESTION", so it always gets the regex
+        if text.startswith('Q') or '\nQ' in text:
+            blocks = q_split.split(text)
+        if len(blocks) < 2 and (not text.isascii() or 'question' in text.lower()):
+            blocks = question_split.split(text)
         if len(blocks) < 2:
-            # Try splitting by QUESTION markers
-            blocks = re.split(r'(?=QUESTION\s*(?:NO)?[:\.]?\s*\d+)', text, flags=re.IGNORECASE)
+            blocks = numbered_split.split(text)
         
-        if len(blocks) < 2:
-            # Try splitting by numbered questions
-            blocks = re.split(r'(?=^\d+[\.\)]\s+)', text, flags=re.MULTILINE)
-        
-        return [b.strip() for b in blocks if b.strip()]
+        stripped = (b.strip() for b in blocks)
+        return [b for b in stripped if b]
     
     def _parse_single_question(self, block: str, text_by_page: Dict[int, str]) -> Optional[ParsedQuestion]:
         """Parse a single question from a text block."""
         # Extract question number from block (e.g., Q230)
         question_number = 0
-        q_num_match = re.match(r'^Q(\d+)', block, re.MULTILINE)
+        q_num_match = self.Q_NUMBER_RE.match(block)
         if q_num_match:
             question_number = int(q_num_match.group(1))
         
         # Check if this is a DRAG DROP or HOTSPOT question (study mode)
         block_upper = block.upper()
-        is_study = 'DRAGDROP' in block_upper or 'DRAG DROP' in block_upper or 'HOTSPOT' in block_upper
+        is_drag_drop = 'DRAGDROP' in block_upper or 'DRAG DROP' in block_upper
+        is_study = is_drag_drop or 'HOTSPOT' in block_upper
         
         # Extract question text
         question_text = self._extract_question_text(block)
@@ -398,23 +706,14 @@ class PDFParser:
         # For study questions, we need text + explanation
         if is_study:
             # Clean up study question text - remove interactive instructions and headers
-            question_text = re.sub(r'^DRAGDROP\s*', '', question_text, flags=re.IGNORECASE)
-            question_text = re.sub(r'^HOTSPOT\s*', '', question_text, flags=re.IGNORECASE)
-            question_text = re.sub(r'Select and Place[:\s]*', '', question_text, flags=re.IGNORECASE)
-            question_text = re.sub(r'Hot Area[:\s]*', '', question_text, flags=re.IGNORECASE)
-            question_text = re.sub(r'Answer by dragging.*?answer area\.?', '', question_text, flags=re.IGNORECASE)
-            question_text = re.sub(r'To answer,.*?answer area\.?', '', question_text, flags=re.IGNORECASE)
-            question_text = re.sub(r'NOTE:.*?point\.?', '', question_text, flags=re.IGNORECASE)
-            
-            # Remove embedded "Answer: Explanation:" text that appears in the question
-            question_text = re.sub(r'Answer:\s*Explanation:.*$', '', question_text, flags=re.IGNORECASE | re.DOTALL)
-            question_text = re.sub(r'\?\s*Answer:.*$', '?', question_text, flags=re.IGNORECASE | re.DOTALL)
+            for pattern, replacement in self.STUDY_CLEANUP_SUBS:
+                question_text = pattern.sub(replacement, question_text)
             
             # Better word separation for PDFs without spaces
             question_text = self._fix_word_spacing(question_text)
             
             # Try to get explanation - look for clean Explanation section after Answer:
-            expl_match = re.search(r'Explanation[:\s]+([A-Z][^Q]+?)(?=Q\d+|$)', block, re.DOTALL)
+            expl_match = self.STUDY_EXPLANATION_RE.search(block)
             if expl_match:
                 explanation = expl_match.group(1).strip()
                 explanation = self._fix_word_spacing(explanation)
@@ -424,13 +723,13 @@ class PDFParser:
             
             # Try Reference URL as explanation
             if not explanation:
-                ref_match = re.search(r'Reference[:\s]*(https?://[^\s]+)', block, re.IGNORECASE)
+                ref_match = self.REFERENCE_URL_RE.search(block)
                 if ref_match:
                     explanation = f"Reference: {ref_match.group(1)}"
             
             # Use helpful fallback based on question type
             if not explanation:
-                if 'DRAGDROP' in block_upper or 'DRAG DROP' in block_upper:
+                if is_drag_drop:
                     explanation = "📋 DRAG & DROP: This question requires matching or ordering items. Focus on understanding the relationships between Azure components mentioned in the scenario."
                 else:
                     explanation = "🎯 HOTSPOT: This question requires selecting areas on a diagram. Focus on understanding the Azure portal interface and configuration options mentioned."
@@ -461,11 +760,11 @@ class PDFParser:
     def _extract_question_text(self, block: str) -> str:
         """Extract the question text from a block."""
         # Remove Q# or QUESTION header
-        text = re.sub(r'^Q\d+\n', '', block, flags=re.MULTILINE)
-        text = re.sub(r'^QUESTION\s*(?:NO)?[:\.]?\s*\d+[:\.\s]*', '', text, flags=re.IGNORECASE)
+        text = self.Q_HEADER_RE.sub('', block)
+        text = self.QUESTION_HEADER_RE.sub('', text)
         
         # Find where choices start (handles both "A. text" and "A.text" formats)
-        choice_match = re.search(r'^[A-F][\.\)]', text, re.MULTILINE)
+        choice_match = self.CHOICE_START_RE.search(text)
         if choice_match:
             text = text[:choice_match.start()]
         
@@ -481,20 +780,22 @@ class PDFParser:
         # Normalize excessive line breaks - replace all \n with space
         normalized_block = block.replace('\n', ' ')
         # Clean up multiple spaces
-        normalized_block = re.sub(r'\s+', ' ', normalized_block)
+        normalized_block = self._collapse_whitespace(normalized_block)
         
         # Find all choice markers and their positions
         choice_positions = []
-        for label in 'ABCDEF':
-            # Look for " A." or " A)" (space before choice letter)
-            # Also match at start of string or after punctuation
-            pattern = rf'(?:^|\s|[.!?])({label}[\.\)])'
-            for match in re.finditer(pattern, normalized_block):
-                # Position after the space/punct and label
-                choice_positions.append((match.start(), label, match.end()))
-        
-        # Sort by position
-        choice_positions.sort()
+        # One scan for all labels, in position order. start includes the
+        # space/punct before the label; hits for the same label never share
+        # that character, as when each label was scanned separately
+        label_ends: Dict[str, int] = {}
+        for match in self.CHOICE_MARKER_RE.finditer(normalized_block):
+            label = match.group(1)
+            start = max(match.start() - 1, 0)
+            if start < label_ends.get(label, 0):
+                continue
+            label_ends[label] = match.end()
+            # Position after the space/punct and label
+            choice_positions.append((start, label, match.end()))
         
         # Extract text between choice markers
         for i, (start, label, text_start) in enumerate(choice_positions):
@@ -502,26 +803,20 @@ class PDFParser:
             if i + 1 < len(choice_positions):
                 end = choice_positions[i + 1][0]
             else:
-                # Last choice - find end markers
-                end_match = re.search(
-                    r'\b(?:Answer:|Explanation:|Reference:|Correct\s+Answer|Q\d+)',
-                    normalized_block[text_start:],
-                    re.IGNORECASE
-                )
+                # Last choice - find end markers (searching from text_start
+                # rather than slicing; the marker before it keeps \b the same)
+                end_match = self.CHOICE_END_RE.search(normalized_block, text_start)
                 if end_match:
-                    end = text_start + end_match.start()
+                    end = end_match.start()
                 else:
                     end = len(normalized_block)
             
             # Extract and clean choice text
             choice_text = normalized_block[text_start:end].strip()
             
-            # Apply word spacing fix
+            # Apply word spacing fix (which also collapses whitespace)
             choice_text = self._fix_word_spacing(choice_text)
             
-            # Final cleanup
-            choice_text = re.sub(r'\s+', ' ', choice_text).strip()
-            
             if choice_text:
                 choices.append({"label": label, "text": choice_text})
         
@@ -550,12 +845,15 @@ class PDFParser:
     
     def _extract_answers(self, block: str) -> List[str]:
         """Extract correct answer(s) from a block."""
+        # Every answer format contains "answer"; skip the scans when it's absent
+        if "answer" not in block.lower():
+            return []
         for pattern in self.ANSWER_PATTERNS:
             match = pattern.search(block)
             if match:
                 answer_text = match.group(1).upper()
                 # Extract individual letters
-                answers = re.findall(r'[A-F]', answer_text)
+                answers = self.ANSWER_LETTER_RE.findall(answer_text)
                 if answers:
                     return answers
         return []
@@ -564,8 +862,7 @@ class PDFParser:
         """Extract explanation text from a block."""
         match = self.EXPLANATION_PATTERN.search(block)
         if match:
-            explanation = match.group(1).strip()
-            explanation = re.sub(r'\s+', ' ', explanation)
+            explanation = ' '.join(match.group(1).split())
             if len(explanation) > 20:  # Minimum meaningful explanation
                 return explanation[:2000]  # Limit length
         return None
@@ -595,11 +892,7 @@ class PDFParser:
             
             # Check if this line starts a new logical section
             # (starts with "Note:", "Solution:", "You", question keywords, etc.)
-            is_section_start = bool(re.match(
-                r'^(Note:|Solution:|After you|You |Your |From |To answer|Each |Some |Does |What |Which |How )',
-                line,
-                re.IGNORECASE
-            ))
+            is_section_start = bool(self.SECTION_START_RE.match(line))
             
             if is_section_start and current_paragraph:
                 # Finish previous paragraph
@@ -624,105 +917,84 @@ class PDFParser:
         if not text:
             return text
         
-        # First pass: Add space before any uppercase letter that follows a lowercase letter
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-        
-        # Add space after punctuation followed by letters
-        text = re.sub(r'([.!?,:;])([A-Za-z])', r'\1 \2', text)
+        # Add spaces between case changes, after punctuation and around parentheses
+        for trigger, pattern, replacement in self.SPACING_SUBS:
+            if trigger is None or trigger in text:
+                text = pattern.sub(replacement, text)
         
-        # Add space before opening parenthesis if preceded by letter
-        text = re.sub(r'([a-zA-Z])\(', r'\1 (', text)
+        # One pass each, looking the fix up by the lowercased match. Every
+        # abbreviation starts "qi" or "qs", so well-spaced ASCII text without
+        # either skips the regex (non-ASCII can case-fold into a match)
+        lowered = text.lower()
+        if not text.isascii() or 'qi' in lowered or 'qs' in lowered:
+            text = self.ABBREVIATION_RE.sub(lambda m: self.ABBREVIATIONS[m.group(0).lower()], text)
+        text = _replace_words(text, self.CONCATENATION_FIXES, self.CONCATENATION_WORDS)
         
-        # Add space after closing parenthesis if followed by letter
-        text = re.sub(r'\)([a-zA-Z])', r') \1', text)
-        
-        # Expand common abbreviations used in exam questions
-        # Use word boundaries to avoid changing parts of other words
-        abbreviations = [
-            (r'\bqis\b', 'question is'),
-            (r'\bqin\b', 'question in'),
-            (r'\bqs\b', 'questions'),
-            (r'\bqsets\b', 'question sets'),
-            (r'\bqset\b', 'question set'),
-        ]
-        for pattern, replacement in abbreviations:
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-        
-        # Fix common multi-word patterns (only for truly concatenated words)
-        patterns = [
-            (r'Youhave', 'You have'),
-            (r'Youneed', 'You need'),
-            (r'Youare', 'You are'),
-            (r'Youplan', 'You plan'),
-            (r'Youwant', 'You want'),
-            (r'Whatshould', 'What should'),
-            (r'Whichof', 'Which of'),
-            (r'tothe', 'to the'),
-            (r'ofthe', 'of the'),
-            (r'inthe', 'in the'),
-            (r'onthe', 'on the'),
-            (r'fromthe', 'from the'),
-            (r'allthe', 'all the'),
-            (r'thatthe', 'that the'),
-            (r'isthe', 'is the'),
-            (r'forthe', 'for the'),
-            (r'andthe', 'and the'),
-            (r'thata', 'that a'),
-            (r'tocreate', 'to create'),
-            (r'toensure', 'to ensure'),
-            (r'tomake', 'to make'),
-            (r'toreference', 'to reference'),
-            (r'todeploy', 'to deploy'),
-            (r'toachieve', 'to achieve'),
-            (r'shouldyou', 'should you'),
-            (r'doyou', 'do you'),
-            (r'canyou', 'can you'),
-        ]
-        for pattern, replacement in patterns:
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-        
-        # Clean up multiple spaces
-        text = re.sub(r'\s+', ' ', text).strip()
+        # Clean up multiple spaces (split() and \s agree on what whitespace is)
+        text = ' '.join(text.split())
         
         return text
     
-    def _find_source_page(self, question_text: str, text_by_page: Dict[int, str]) -> int:
-        """Find which page contains the question."""
-        if not question_text:
-            return 0
-        
-        # Use first 50 chars as search string
-        search_text = question_text[:50].lower()
+    def _collapse_whitespace(self, text: str) -> str:
+        """Same result as WHITESPACE_RE.sub(' ', text), via str.split (about 5x faster)."""
+        collapsed = ' '.join(text.split())
+        # split() drops edge whitespace, which the regex keeps as one space
+        if text[:1].isspace():
+            collapsed = ' ' + collapsed
+        if text[-1:].isspace() and collapsed != ' ':
+            collapsed += ' '
+        return collapsed
+    
+    def _normalize_pages(self, text_by_page: Dict[int, str]) -> Tuple[List[int], List[int], str]:
+        """Whitespace-collapsed lowercase page text for page lookups.
         
+        Returns (page_nums, starts, joined): all pages joined with NUL, and
+        the page number and offset of each page in joined.
+        """
+        page_nums = []
+        starts = []
+        pages = []
+        offset = 0
         for page_num, page_text in text_by_page.items():
-            if search_text in page_text.lower():
-                return page_num
-        
-        return 0
+            normalized = self._collapse_whitespace(page_text).lower()
+            page_nums.append(page_num)
+            starts.append(offset)
+            pages.append(normalized)
+            offset += len(normalized) + 1
+        return page_nums, starts, "\0".join(pages)
     
-    def _find_pdf_page_for_question(self, question_text: str, text_by_page: Dict[int, str]) -> int:
-        """Find the actual PDF page containing a question using longer, unique text match."""
+    def _find_pdf_page_for_question(self, question_text: str, normalized_pages: Tuple[List[int], List[int], str]) -> int:
+        """Find the actual PDF page containing a question using longer, unique text match.
+        
+        normalized_pages comes from _normalize_pages, built once per PDF, so
+        each lookup is one str.find over every page instead of a loop.
+        """
         if not question_text:
             return 0
         
-        # Normalize whitespace in search text for better matching
-        search_text = re.sub(r'\s+', ' ', question_text[:200]).lower()
-        
-        for page_num, page_text in text_by_page.items():
-            # Normalize page text whitespace too
-            normalized_page = re.sub(r'\s+', ' ', page_text).lower()
-            if search_text in normalized_page:
-                return page_num
-        
-        # Fallback: try with first 100 chars
-        search_text = re.sub(r'\s+', ' ', question_text[:100]).lower()
-        for page_num, page_text in text_by_page.items():
-            normalized_page = re.sub(r'\s+', ' ', page_text).lower()
-            if search_text in normalized_page:
+        # Normalize whitespace in search text for better matching, then
+        # fall back to the first 100 chars
+        for length in (200, 100):
+            search_text = self._collapse_whitespace(question_text[:length]).lower()
+            page_num = self._find_normalized_page(search_text, normalized_pages)
+            if page_num:
                 return page_num
         
         return 0
     
+    def _find_normalized_page(self, search_text: str, normalized_pages: Tuple[List[int], List[int], str]) -> int:
+        """First page whose normalized text contains search_text, or 0."""
+        page_nums, starts, joined = normalized_pages
+        pos = joined.find(search_text)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            page_end = starts[i + 1] - 1 if i + 1 < len(starts) else len(joined)
+            if pos + len(search_text) <= page_end:
+                return page_nums[i]
+            # Only matched across a page separator; try again from the next page
+            pos = joined.find(search_text, pos + 1)
+        return 0
+    
     def _extract_and_link_images(self, filepath: Path, questions: List[ParsedQuestion], text_by_page: Dict[int, str]):
         """Extract images from PDF and link them to questions with exhibits or table images.
         
@@ -740,32 +1012,30 @@ class PDFParser:
         
         try:
             doc = fitz.open(filepath)
+            page_count = len(doc)
             
-            # Track which questions reference exhibits
-            exhibit_keywords = [
-                "following exhibit", "shown in the following", "as shown in",
-                "following diagram", "following image", "exhibit", "shown below"
-            ]
-            
-            # Keywords that suggest tabular data is expected
-            table_keywords = [
-                "following users", "following resources", "following table",
-                "following virtual machines", "following storage accounts",
-                "following subscriptions", "contains the following",
-                "following information", "following configuration",
-                "following azure", "following settings", "following locations"
-            ]
-            
+            normalized_pages = None  # built on the first question that needs it
+            # Neighbouring questions share candidate pages, so page image lists
+            # and image metadata are read once per PDF (bytes only for the winner)
+            page_images = {}  # page index -> get_images() list
+            image_info = {}  # xref -> (ext, width, height, size)
+            # Consecutive questions often share one exhibit, so the last saved
+            # image's bytes are kept instead of extracting it again
+            last_saved = (None, b"")  # (xref, image bytes)
             for q in questions:
                 q_text_lower = q.text.lower()
-                expects_table = any(keyword in q_text_lower for keyword in table_keywords)
-                has_exhibit_hint = any(keyword in q_text_lower for keyword in exhibit_keywords) or expects_table
+                if not any(word in q_text_lower for word in self.EXHIBIT_HINT_WORDS):
+                    continue
+                expects_table = any(keyword in q_text_lower for keyword in self.TABLE_KEYWORDS)
+                has_exhibit_hint = expects_table or any(keyword in q_text_lower for keyword in self.EXHIBIT_KEYWORDS)
                 if not has_exhibit_hint:
                     continue
                 
                 # Find the actual PDF page containing this question text
                 # (source_page is the question number, not the PDF page number)
-                pdf_page_num = self._find_pdf_page_for_question(q.text, text_by_page)
+                if normalized_pages is None:
+                    normalized_pages = self._normalize_pages(text_by_page)
+                pdf_page_num = self._find_pdf_page_for_question(q.text, normalized_pages)
                 if not pdf_page_num or pdf_page_num == 0:
                     continue
                 
@@ -773,59 +1043,58 @@ class PDFParser:
                 cand_pages = [pdf_page_num - 1]
                 if pdf_page_num > 1:
                     cand_pages.append(pdf_page_num - 2)
-                if pdf_page_num < len(doc):
+                if pdf_page_num < page_count:
                     cand_pages.append(pdf_page_num)  # next (0-index add later)
                 
                 # Collect candidate images with a score
-                best = None  # (score, filename, width, height)
+                best = None  # (score, pidx, img_index, xref, ext, width, height)
                 for pidx in sorted(set(cand_pages)):
-                    if pidx < 0 or pidx >= len(doc):
+                    if pidx < 0 or pidx >= page_count:
                         continue
-                    page = doc[pidx]
-                    for img_index, img in enumerate(page.get_images(full=True)):
+                    images = page_images.get(pidx)
+                    if images is None:
+                        images = page_images[pidx] = doc[pidx].get_images(full=True)
+                    on_matched_page = pidx == pdf_page_num - 1
+                    for img_index, img in enumerate(images):
+                        bound = self._extracted_size_bound(img)
+                        if bound is not None:
+                            # Skip icons, and images that can't outscore the
+                            # current best even at their largest possible size
+                            if bound < self.MIN_IMAGE_BYTES:
+                                continue
+                            if best is not None and score_exhibit_image(
+                                bound, img[2], img[3], expects_table, on_matched_page
+                            ) <= best[0]:
+                                continue
                         xref = img[0]
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        image_ext = base_image["ext"]
-                        width = base_image.get("width", 0)
-                        height = base_image.get("height", 0)
-                        size = len(image_bytes)
+                        info = image_info.get(xref)
+                        if info is None:
+                            base_image = doc.extract_image(xref)
+                            info = image_info[xref] = (
+                                base_image["ext"],
+                                base_image.get("width", 0),
+                                base_image.get("height", 0),
+                                len(base_image["image"]),
+                            )
+                        image_ext, width, height, size = info
                         
                         # Skip tiny icons/logos (less than 5KB)
-                        if size < 5000:
+                        if size < self.MIN_IMAGE_BYTES:
                             continue
                         
-                        # Table-like images (wide, short)
-                        table_like = width > 300 and height > 50 and width / max(height, 1) > 1.5
-                        
-                        # Base score from size (prefer larger)
-                        score = size / 10000.0
-                        
-                        # Strongly prefer table-like when table is expected
-                        if expects_table and table_like:
-                            score += 5.0
-                        elif table_like:
-                            score += 1.0
-                        
-                        # Slightly prefer images on the matched page
-                        if pidx == pdf_page_num - 1:
-                            score += 0.5
-                        
-                        # Filename
-                        stable_suffix = getattr(q, 'stable_id', '')[:8]
-                        filename = f"q{q.source_page}_{stable_suffix}_img{pidx}_{img_index}.{image_ext}"
-                        filepath_img = self.exhibits_dir / filename
-                        
+                        score = score_exhibit_image(size, width, height, expects_table, on_matched_page)
                         if best is None or score > best[0]:
-                            best = (score, filename, image_bytes, width, height)
+                            best = (score, pidx, img_index, xref, image_ext, width, height)
                 
                 if best is None:
                     continue
                 
                 # Save best image
-                score, filename, image_bytes, width, height = best
-                with open(self.exhibits_dir / filename, "wb") as img_file:
-                    img_file.write(image_bytes)
+                score, pidx, img_index, xref, image_ext, width, height = best
+                filename = f"q{q.source_page}_{q.stable_id[:8]}_img{pidx}_{img_index}.{image_ext}"
+                if last_saved[0] != xref:
+                    last_saved = (xref, doc.extract_image(xref)["image"])
+                (self.exhibits_dir / filename).write_bytes(last_saved[1])
                 q.exhibit_image = f"/static/exhibits/{filename}"
                 logger.info(f"Linked image for Q{q.source_page}: {filename} ({width}x{height}, score={score:.2f})")
             
@@ -833,6 +1102,20 @@ class PDFParser:
         except Exception as e:
             logger.error(f"Failed to extract images from {filepath}: {e}")
     
+    def _extracted_size_bound(self, img: tuple) -> Optional[int]:
+        """Upper bound on extract_image() bytes for a get_images(full=True) entry.
+        
+        Unfiltered and Flate images in a Device colorspace are extracted as
+        PNG with no embedded profile, so their size is bounded by the raw
+        samples (at most 4 channels at bpc bits) plus filter bytes and chunk
+        headers. JPEG/JPX streams are returned as stored and can't be bounded
+        (None).
+        """
+        width, height, bpc, colorspace, image_filter = img[2], img[3], img[4], img[5], img[8]
+        if image_filter not in ("", "FlateDecode") or not colorspace.startswith("Device"):
+            return None
+        return width * height * bpc // 2 + height + 1024
+    
     def _detect_question_series(self, questions: List[ParsedQuestion]):
         """Detect related questions (series) and assign series_id.
         
@@ -840,54 +1123,44 @@ class PDFParser:
         1. Explicit "Note: This question is part of a series" markers
         2. Questions that share identical scenario text (same table, same setup)
         """
-        # Patterns that indicate a question is part of a series
-        series_patterns = [
-            r"note:\s*this question is part of a series",
-            r"note:\s*the question is included in a number of questions",
-            r"part of a series of questions",
-            r"identical set-up",
-            r"depicts the identical",
-            r"same scenario",
-            r"questions that share the same",
-            r"questions that present the same scenario",
-        ]
-        
         # First pass: detect explicit series markers and extract core scenarios
-        series_scenarios = {}  # {scenario_hash: series_id}
+        # Keyed by the scenario text itself, so only marked questions are hashed
+        series_scenarios = {}  # {core_scenario: series_id}
+        unmarked = []  # candidates for the second pass
         
         for q in questions:
-            q_text_lower = q.text.lower()
-            
-            # Check if this question has explicit series marker
+            # Check if this question has explicit series marker (the
+            # patterns ignore case, so the text isn't lowercased first)
             has_series_marker = any(
-                re.search(pattern, q_text_lower, re.IGNORECASE) 
-                for pattern in series_patterns
+                pattern.search(q.text) for pattern in self.SERIES_MARKER_PATTERNS
             )
             
             if has_series_marker:
                 # Extract the core scenario (after the Note: section)
                 # This is typically the setup that's shared across series questions
                 core_scenario = self._extract_core_scenario(q.text)
-                scenario_hash = hashlib.sha256(core_scenario.encode()).hexdigest()[:12]
                 
-                if scenario_hash not in series_scenarios:
-                    series_scenarios[scenario_hash] = scenario_hash
+                if core_scenario not in series_scenarios:
+                    # Stored as series_id; blake2b measured no faster on 200 chars
+                    scenario_hash = hashlib.sha256(core_scenario.encode()).hexdigest()[:12]
+                    series_scenarios[core_scenario] = scenario_hash
                     logger.info(f"Detected series at Q{q.source_page}: {scenario_hash}")
                 
-                q.series_id = series_scenarios[scenario_hash]
+                q.series_id = series_scenarios[core_scenario]
+            elif not q.series_id:
+                unmarked.append(q)
         
-        # Second pass: find questions that share the same core scenario
-        for q in questions:
-            if q.series_id:  # Already assigned
-                continue
-            
-            core_scenario = self._extract_core_scenario(q.text)
-            scenario_hash = hashlib.sha256(core_scenario.encode()).hexdigest()[:12]
-            
+        # Without a marked series there is nothing for the rest to join
+        if not series_scenarios:
+            return
+        
+        # Second pass: find unmarked questions that share the same core scenario
+        for q in unmarked:
             # Check if this scenario matches any known series
-            if scenario_hash in series_scenarios:
-                q.series_id = series_scenarios[scenario_hash]
-                logger.info(f"Linked Q{q.source_page} to series {scenario_hash}")
+            series_id = series_scenarios.get(self._extract_core_scenario(q.text))
+            if series_id:
+                q.series_id = series_id
+                logger.info(f"Linked Q{q.source_page} to series {series_id}")
     
     def _extract_core_scenario(self, text: str) -> str:
         """Extract the core scenario text from a question for series matching.
@@ -896,45 +1169,41 @@ class PDFParser:
         shared scenario that's common across series questions.
         """
         # Remove the "Note: This question is part of a series..." header
-        text = re.sub(
-            r'^Note:.*?(?=You have|You are|Your company|A company)',
-            '',
-            text,
-            flags=re.IGNORECASE | re.DOTALL
-        )
+        text = self.SCENARIO_NOTE_RE.sub('', text)
         
         # Remove "After you answer..." warning text
-        text = re.sub(
-            r'After you answer a question in this section.*?review screen\.?\s*',
-            '',
-            text,
-            flags=re.IGNORECASE | re.DOTALL
-        )
+        text = self.SCENARIO_WARNING_RE.sub('', text)
         
         # Extract up to the "Solution:" or "Does that meet" part
         # This gives us the shared scenario without the solution
-        solution_match = re.search(r'Solution:|Does that meet|What should you', text, re.IGNORECASE)
+        solution_match = self.SCENARIO_SOLUTION_RE.search(text)
         if solution_match:
             text = text[:solution_match.start()]
         
         # Normalize variations for better matching
         # Remove minor wording differences
-        text = re.sub(r"Your company's Azure solution", "Your company", text, flags=re.IGNORECASE)
-        text = re.sub(r"Your company's", "Your company", text, flags=re.IGNORECASE)
-        text = re.sub(r"makes use of", "uses", text, flags=re.IGNORECASE)
+        for pattern, replacement in self.SCENARIO_WORDING_SUBS:
+            text = pattern.sub(replacement, text)
         
         # Clean and normalize
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = ' '.join(text.split())
         
         # Take first 200 chars as scenario fingerprint (shorter for better matching)
         return text[:200]
 
 
 def get_demo_questions() -> List[ParsedQuestion]:
-    """Generate demo questions when no PDFs are available."""
-    classifier = get_classifier()
+    """Demo questions for when no PDFs are available.
     
-    demos = [
+    The questions are built once and shared between calls; only the list
+    is new each time, so callers must not edit the questions themselves.
+    """
+    return list(_demo_questions())
+
+
+@lru_cache(maxsize=1)
+def _demo_questions() -> Tuple[ParsedQuestion, ...]:
+    return (
         ParsedQuestion(
             text="You need to create a new Azure subscription. What should you use?",
             choices=[
@@ -1005,6 +1274,4 @@ def get_demo_questions() -> List[ParsedQuestion]:
             domain_id="monitoring",
             source_page=1,
         ),
-    ]
-    
-    return demos
+    )
@@ -3,11 +3,26 @@ import random
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Float, case, cast, func
 
 from ..models import Question, ExamSession, DomainStats
 from ..config import EXAM_QUESTION_COUNT, PASSING_SCORE, MAX_SCALED_SCORE
 
+# All the series grouping reads, so selectors skip loading full Question rows
+_SELECTION_COLUMNS = (Question.id, Question.series_id, Question.sequence_number)
+
+
+def _inverted_accuracy(correct, shown):
+    """SQL for max(0.1, 1 - correct / shown); shown must be > 0."""
+    inverted = 1.0 - cast(correct, Float) / shown
+    return case((inverted < 0.1, 0.1), else_=inverted)
+
+
+def _is_correct(selected: List[str], correct_answers: List[str]) -> bool:
+    """Whether the selected labels match the correct ones, ignoring order."""
+    # Answers usually arrive in label order, where the list compare decides
+    return selected == correct_answers or set(selected) == set(correct_answers)
+
 
 class SessionService:
     """Service for managing exam sessions."""
@@ -36,6 +51,8 @@ class SessionService:
             total_questions=len(question_ids),
             question_ids=question_ids,
             answers={},
+            answered_count=0,
+            flagged_count=0,
         )
         
         self.db.add(session)
@@ -44,11 +61,11 @@ class SessionService:
         
         return session
     
-    def _group_and_select_with_series(self, questions: List[Question], count: int) -> List[int]:
+    def _group_and_select_with_series(self, questions: List, count: int) -> List[int]:
         """Group questions by series and select while keeping series together.
         
         Args:
-            questions: List of Question objects to select from
+            questions: Rows with id, series_id and sequence_number to select from
             count: Target number of questions to select
             
         Returns:
@@ -69,9 +86,6 @@ class SessionService:
         # Convert series groups to tuples (all questions in series kept together)
         series_units = list(series_groups.values())
         
-        # Randomize standalone questions
-        random.shuffle(standalone_questions)
-        
         # Randomize order of series units
         random.shuffle(series_units)
         
@@ -90,11 +104,10 @@ class SessionService:
                 selected_ids.extend([q.id for q in series_questions])
                 remaining_count -= len(series_questions)
         
-        # Fill remaining slots with standalone questions
-        for q in standalone_questions:
-            if len(selected_ids) >= count:
-                break
-            selected_ids.append(q.id)
+        # Fill remaining slots with a random sample of standalone questions,
+        # drawing only as many as fit instead of shuffling them all
+        fill = random.sample(standalone_questions, min(remaining_count, len(standalone_questions)))
+        selected_ids.extend(q.id for q in fill)
         
         return selected_ids[:count]
     
@@ -119,14 +132,13 @@ class SessionService:
         Questions in the same series are kept together in sequence.
         """
         # First, try to get only unseen questions (times_shown == 0)
-        unseen = self.db.query(Question).filter(
+        # with at least 2 choices
+        unseen = self.db.query(*_SELECTION_COLUMNS).filter(
             Question.question_type != 'study',
+            Question.choice_count >= 2,
             Question.times_shown == 0
         ).order_by(Question.sequence_number).all()
         
-        # Only include questions with at least 2 choices
-        unseen = [q for q in unseen if len(q.choices or []) >= 2]
-        
         if len(unseen) >= count:
             # Enough unseen questions - pick from those
             return self._group_and_select_with_series(unseen, count)
@@ -134,20 +146,20 @@ class SessionService:
         # Not enough unseen - use all unseen plus some seen (sorted by fewest times_shown)
         if unseen:
             # Get additional questions sorted by times_shown (least shown first)
-            seen = self.db.query(Question).filter(
+            seen = self.db.query(*_SELECTION_COLUMNS).filter(
                 Question.question_type != 'study',
+                Question.choice_count >= 2,
                 Question.times_shown > 0
             ).order_by(Question.times_shown, Question.sequence_number).all()
-            seen = [q for q in seen if len(q.choices or []) >= 2]
             
             # Combine unseen + least-seen
             all_questions = unseen + seen
         else:
             # All questions have been seen - fall back to least-seen first
-            all_questions = self.db.query(Question).filter(
-                Question.question_type != 'study'
+            all_questions = self.db.query(*_SELECTION_COLUMNS).filter(
+                Question.question_type != 'study',
+                Question.choice_count >= 2
             ).order_by(Question.times_shown, Question.sequence_number).all()
-            all_questions = [q for q in all_questions if len(q.choices or []) >= 2]
         
         return self._group_and_select_with_series(all_questions, count)
     
@@ -156,58 +168,47 @@ class SessionService:
         
         Series questions are kept together.
         """
-        # Get all valid questions
-        all_questions = self.db.query(Question).filter(
-            Question.question_type != 'study'
+        # Get all valid questions (at least 2 choices), unseen (times_shown=0) first
+        valid_questions = self.db.query(*_SELECTION_COLUMNS).filter(
+            Question.question_type != 'study',
+            Question.choice_count >= 2
         ).order_by(Question.times_shown, Question.sequence_number).all()
         
-        # Filter to valid questions (at least 2 choices)
-        valid_questions = [q for q in all_questions if len(q.choices or []) >= 2]
-        
-        # Sort so unseen (times_shown=0) come first
-        valid_questions.sort(key=lambda q: (q.times_shown, q.sequence_number))
-        
         # Use series grouping
         return self._group_and_select_with_series(valid_questions, count)
     
     def _select_weak_areas(self, count: int) -> List[int]:
         """Oversample questions from domains with low accuracy.
         
-        Series questions are kept together.
+        Weights are computed and sorted in SQL, and only the columns the
+        series grouping needs are loaded. Series questions are kept together.
         """
-        # Get domain stats
-        domain_stats = self.db.query(DomainStats).filter(
-            DomainStats.total_shown > 0
-        ).all()
-        
-        # Calculate weights (lower accuracy = higher weight)
-        domain_weights = {}
-        for stat in domain_stats:
-            # Invert accuracy for weight, minimum 0.1
-            weight = max(0.1, 1.0 - stat.accuracy)
-            domain_weights[stat.domain_id] = weight
-        
-        if not domain_weights:
+        has_domain_stats = self.db.query(
+            self.db.query(DomainStats).filter(DomainStats.total_shown > 0).exists()
+        ).scalar()
+        if not has_domain_stats:
             return self._select_random(count)
         
-        # Get all valid questions and assign weights
-        all_questions = self.db.query(Question).filter(
-            Question.question_type != 'study'
-        ).order_by(Question.sequence_number).all()
-        
-        valid_questions = []
-        for q in all_questions:
-            if len(q.choices or []) < 2:
-                continue
-            weight = domain_weights.get(q.domain_id, 0.5)
-            if q.times_shown > 0:
-                q_weight = max(0.1, 1.0 - q.accuracy)
-                weight = (weight + q_weight) / 2
-            q._weight = weight  # Attach weight to question object
-            valid_questions.append(q)
+        # Invert accuracy for weight, minimum 0.1; 0.5 for domains without stats
+        domain_weight = case(
+            (DomainStats.id.is_(None), 0.5),
+            else_=_inverted_accuracy(DomainStats.total_correct, DomainStats.total_shown),
+        )
+        # Questions already shown average in their own inverted accuracy
+        weight = case(
+            (Question.times_shown > 0,
+             (domain_weight + _inverted_accuracy(Question.times_correct, Question.times_shown)) / 2),
+            else_=domain_weight,
+        )
         
         # Sort by weight (higher weight = weaker = first)
-        valid_questions.sort(key=lambda q: -getattr(q, '_weight', 0.5))
+        valid_questions = self.db.query(*_SELECTION_COLUMNS).outerjoin(
+            DomainStats,
+            (DomainStats.domain_id == Question.domain_id) & (DomainStats.total_shown > 0),
+        ).filter(
+            Question.question_type != 'study',
+            Question.choice_count >= 2,
+        ).order_by(weight.desc(), Question.sequence_number).all()
         
         # Use series grouping
         return self._group_and_select_with_series(valid_questions, count)
@@ -218,12 +219,12 @@ class SessionService:
         Series questions are kept together.
         """
         # Get questions that have been answered incorrectly (with at least 2 choices)
-        wrong = self.db.query(Question).filter(
+        wrong = self.db.query(*_SELECTION_COLUMNS).filter(
             Question.times_shown > Question.times_correct,
             Question.times_shown > 0,
-            Question.question_type != 'study'
+            Question.question_type != 'study',
+            Question.choice_count >= 2
         ).order_by(Question.sequence_number).all()
-        wrong = [q for q in wrong if len(q.choices or []) >= 2]
         
         if not wrong:
             # Fallback to random if no wrong answers
@@ -250,13 +251,19 @@ class SessionService:
         if session.completed_at:
             raise ValueError("Session already completed")
         
-        # Update answers
+        # Update answers, adjusting the stored counts by this question's change
+        answered_count, flagged_count = session.answer_counts()
         answers = dict(session.answers) if session.answers else {}
+        previous = answers.get(str(question_id), {})
+        answered_count += bool(selected) - bool(previous.get("selected"))
+        flagged_count += bool(flagged) - bool(previous.get("flagged"))
         answers[str(question_id)] = {
             "selected": selected,
             "flagged": flagged,
         }
         session.answers = answers
+        session.answered_count = answered_count
+        session.flagged_count = flagged_count
         
         self.db.commit()
         self.db.refresh(session)
@@ -278,18 +285,24 @@ class SessionService:
         # Grade each question
         correct_count = 0
         results = []
-        
-        for qid in session.question_ids:
-            question = self.db.query(Question).filter(Question.id == qid).first()
+        question_ids = session.question_ids
+        questions_by_id = self._questions_by_id(question_ids)
+        # Read the JSON column once rather than through the ORM descriptor per question
+        answers = session.answers or {}
+        # (shown, correct) per domain, applied once after grading
+        domain_deltas: Dict[str, Tuple[int, int]] = {}
+        
+        for qid in question_ids:
+            question = questions_by_id.get(qid)
             if not question:
                 continue
             
             # Get user's answer
-            answer_data = (session.answers or {}).get(str(qid), {})
+            answer_data = answers.get(str(qid), {})
             selected = answer_data.get("selected", [])
             
             # Check if correct
-            is_correct = set(selected) == set(question.correct_answers)
+            is_correct = _is_correct(selected, question.correct_answers)
             if is_correct:
                 correct_count += 1
             
@@ -298,8 +311,10 @@ class SessionService:
             if is_correct:
                 question.times_correct += 1
             
-            # Update domain stats
-            self._update_domain_stats(question.domain_id, is_correct)
+            # Tally domain stats
+            if question.domain_id:
+                shown, correct = domain_deltas.get(question.domain_id, (0, 0))
+                domain_deltas[question.domain_id] = (shown + 1, correct + int(is_correct))
             
             results.append({
                 "question_id": qid,
@@ -310,6 +325,8 @@ class SessionService:
                 "domain_id": question.domain_id,
             })
         
+        self._update_domain_stats(domain_deltas)
+        
         # Calculate scores
         total = session.total_questions
         percent_score = (correct_count / total * 100) if total > 0 else 0
@@ -336,19 +353,29 @@ class SessionService:
             "results": results,
         }
     
-    def _update_domain_stats(self, domain_id: str, is_correct: bool):
-        """Update aggregated domain statistics."""
-        if not domain_id:
-            return
-        
-        stats = self.db.query(DomainStats).filter(
-            DomainStats.domain_id == domain_id
-        ).first()
+    def _questions_by_id(self, question_ids: List[int]) -> Dict[int, Question]:
+        """Load a session's questions with one IN query instead of one query each."""
+        if not question_ids:
+            return {}
+        questions = self.db.query(Question).filter(Question.id.in_(question_ids)).all()
+        return {q.id: q for q in questions}
+    
+    def _update_domain_stats(self, domain_deltas: Dict[str, Tuple[int, int]]):
+        """Add (shown, correct) deltas to the aggregated domain statistics.
         
-        if stats:
-            stats.total_shown += 1
-            if is_correct:
-                stats.total_correct += 1
+        One UPDATE for all domains: the deltas are picked per row with a CASE
+        on domain_id, so the statement is parsed and planned once.
+        """
+        if not domain_deltas:
+            return
+        shown = case({d: delta[0] for d, delta in domain_deltas.items()}, value=DomainStats.domain_id)
+        correct = case({d: delta[1] for d, delta in domain_deltas.items()}, value=DomainStats.domain_id)
+        self.db.query(DomainStats).filter(
+            DomainStats.domain_id.in_(list(domain_deltas))
+        ).update({
+            DomainStats.total_shown: DomainStats.total_shown + shown,
+            DomainStats.total_correct: DomainStats.total_correct + correct,
+        }, synchronize_session=False)
     
     def get_session_results(self, session_id: int) -> Optional[Dict]:
         """Get detailed results for a completed session."""
@@ -362,15 +389,18 @@ class SessionService:
         # Build detailed results
         question_results = []
         domain_breakdown = {}
+        question_ids = session.question_ids
+        questions_by_id = self._questions_by_id(question_ids)
+        answers = session.answers or {}
         
-        for qid in session.question_ids:
-            question = self.db.query(Question).filter(Question.id == qid).first()
+        for qid in question_ids:
+            question = questions_by_id.get(qid)
             if not question:
                 continue
             
-            answer_data = (session.answers or {}).get(str(qid), {})
+            answer_data = answers.get(str(qid), {})
             selected = answer_data.get("selected", [])
-            is_correct = set(selected) == set(question.correct_answers)
+            is_correct = _is_correct(selected, question.correct_answers)
             
             question_results.append({
                 "question": question.to_dict(include_answer=True),
@@ -0,0 +1,36 @@
+"""StaticFiles variants that emit caching headers."""
+import os
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+# Vite fingerprints everything under /assets, so those URLs never change content
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Exhibit images keep their names across re-imports, so allow a week then revalidate
+EXHIBIT_CACHE_CONTROL = "public, max-age=604800"
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with a fixed Cache-Control and a cheap size/mtime ETag."""
+    
+    def __init__(self, *args, cache_control: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+    
+    def file_response(
+        self,
+        full_path: os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["etag"] = f'"{stat_result.st_size:x}-{int(stat_result.st_mtime):x}"'
+        response.headers["cache-control"] = self.cache_control
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
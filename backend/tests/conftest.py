@@ -1,16 +1,25 @@
 """Pytest configuration and fixtures."""
+import os
+
+# Tables are emptied per test, so user ids repeat - never serve cached users
+os.environ.setdefault("CACHE_AUTH", "0")
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_session_factory
 from app.main import app
 
 
-# Test database
-TEST_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+# Test database: in-memory, shared by every session through one connection
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -23,26 +32,39 @@ def override_get_db():
         db.close()
 
 
-@pytest.fixture(scope="function")
-def db():
-    """Create a fresh database for each test."""
+@pytest.fixture(scope="session")
+def tables():
+    """Create the schema once for the whole run."""
     Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db(tables):
+    """Database session on empty tables for each test."""
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        # Emptying the tables is cheaper than dropping and recreating them
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """Test client whose app startup runs once per test run."""
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="function")
-def client(db):
+def client(db, app_client):
     """Create a test client with database override."""
     app.dependency_overrides[get_db] = override_get_db
-    Base.metadata.create_all(bind=engine)
-    
-    with TestClient(app) as test_client:
-        yield test_client
-    
-    Base.metadata.drop_all(bind=engine)
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    yield app_client
     app.dependency_overrides.clear()
@@ -12,6 +12,12 @@ class TestHealthEndpoint:
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
     
+    def test_large_responses_are_gzipped(self, client):
+        """Test that JSON responses above the size threshold are compressed."""
+        response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+    
     def test_root_endpoint(self, client):
         """Test root endpoint returns app info."""
         response = client.get("/")
@@ -40,6 +46,26 @@ class TestImportEndpoints:
         # Should offer demo questions when no PDFs
         assert data["needs_import"] == True
 
+    
+    def test_import_status_skips_completed_files(self, client, db, tmp_path, monkeypatch):
+        """Test that a PDF with a completed ImportRecord is not reported as new."""
+        import hashlib
+        from app.models import ImportRecord
+        from app.routers import import_router
+        
+        (tmp_path / "done.pdf").write_bytes(b"%PDF done")
+        (tmp_path / "new.pdf").write_bytes(b"%PDF new")
+        monkeypatch.setattr(import_router, "PDFS_DIR", tmp_path)
+        db.add(ImportRecord(
+            filename="done.pdf",
+            file_hash=hashlib.sha256(b"%PDF done").hexdigest(),
+            status="completed",
+        ))
+        db.commit()
+        
+        data = client.get("/api/import/status").json()
+        assert data["pdf_files_found"] == 2
+        assert data["new_files"] == ["new.pdf"]
 
 class TestDashboardEndpoints:
     """Tests for dashboard endpoints."""
@@ -111,3 +137,584 @@ class TestExportEndpoints:
         response = client.get("/api/export/missed.csv")
         assert response.status_code == 200
         assert "text/csv" in response.headers["content-type"]
+    
+    def test_export_missed_csv_rows(self, client, db):
+        """Test that missed questions are streamed as CSV rows."""
+        db.add(Question(
+            stable_id="missed_1",
+            text="Missed question?",
+            choices=[{"label": "A", "text": "Option A"}, {"label": "B", "text": "Option B"}],
+            correct_answers=["A", "B"],
+            domain_id="storage",
+            times_shown=4,
+            times_correct=1,
+        ))
+        db.add(Question(
+            stable_id="never_missed",
+            text="Always right?",
+            choices=[{"label": "A", "text": "Option A"}, {"label": "B", "text": "Option B"}],
+            correct_answers=["A"],
+            times_shown=2,
+            times_correct=2,
+        ))
+        db.commit()
+        
+        response = client.get("/api/export/missed.csv")
+        assert response.status_code == 200
+        lines = response.text.strip().splitlines()
+        assert len(lines) == 2
+        assert lines[1].startswith("missed_1,Missed question?,\"A, B\",storage,4,1,25.0")
+
+
+class TestQuestionStatsEndpoint:
+    """Tests for question statistics."""
+    
+    def test_question_stats_grouped_by_domain(self, client, db):
+        """Test that totals and per-domain counts are aggregated."""
+        for i, (domain, shown) in enumerate([("storage", 0), ("storage", 2), (None, 0)]):
+            db.add(Question(
+                stable_id=f"stats_{i}",
+                text=f"Stats question {i}?",
+                choices=[{"label": "A", "text": "Option A"}],
+                correct_answers=["A"],
+                domain_id=domain,
+                times_shown=shown,
+            ))
+        db.commit()
+        
+        response = client.get("/api/stats/questions")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert data["unseen"] == 2
+        assert data["seen"] == 1
+        counts = {d["domain_id"]: d["count"] for d in data["by_domain"]}
+        assert counts == {"storage": 2, "unknown": 1}
+
+
+class TestDashboardAggregates:
+    """Tests for dashboard session aggregates."""
+    
+    def test_dashboard_session_overview(self, client, db):
+        """Test average score and passing rate over completed sessions."""
+        from datetime import datetime
+        from app.models import ExamSession
+        
+        for score, passed in [(800, True), (600, False), (None, None)]:
+            db.add(ExamSession(
+                mode="random",
+                question_ids=[1],
+                completed_at=datetime.utcnow(),
+                scaled_score=score,
+                passed=passed,
+            ))
+        db.add(ExamSession(mode="random", question_ids=[1]))  # In progress
+        db.commit()
+        
+        response = client.get("/api/dashboard")
+        assert response.status_code == 200
+        overview = response.json()["overview"]
+        assert overview["total_sessions"] == 3
+        assert overview["average_score"] == round(1400 / 3)
+        assert overview["passing_rate"] == round(100 / 3)
+
+
+class TestModelSerialization:
+    """Tests for ORM to_dict helpers."""
+    
+    def test_to_dict_after_commit_reloads_expired_columns(self, db):
+        """Test that to_dict sees committed values once attributes expire."""
+        from datetime import datetime
+        from app.models import ExamSession
+        
+        session = ExamSession(
+            mode="random",
+            question_ids=[1, 2],
+            time_limit_minutes=100,
+            started_at=datetime.utcnow(),
+        )
+        db.add(session)
+        db.commit()  # Expires every attribute
+        
+        data = session.to_dict()
+        assert data["id"] == session.id
+        assert data["question_ids"] == [1, 2]
+        assert 0 < data["time_remaining_seconds"] <= 6000
+        
+        session.completed_at = datetime.utcnow()
+        db.commit()
+        assert session.to_dict()["time_remaining_seconds"] == 0
+
+
+class TestFrontendMount:
+    """Tests for serving the built SPA."""
+    
+    @pytest.fixture
+    def spa_client(self, tmp_path):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.frontend_mount import mount_frontend
+        
+        (tmp_path / "assets").mkdir()
+        (tmp_path / "assets" / "app-abc123.js").write_text("console.log(1)")
+        (tmp_path / "index.html").write_text("<html>spa</html>")
+        (tmp_path / "favicon.ico").write_bytes(b"ico")
+        
+        spa_app = FastAPI()
+        
+        @spa_app.get("/api/ping")
+        def ping():
+            return {"ok": True}
+        
+        mount_frontend(spa_app, tmp_path)
+        return TestClient(spa_app)
+    
+    def test_serves_files_and_spa_fallback(self, spa_client):
+        """Test real files are served and unknown routes get index.html."""
+        assert spa_client.get("/favicon.ico").content == b"ico"
+        assert spa_client.get("/").text == "<html>spa</html>"
+        assert spa_client.get("/exam/42").text == "<html>spa</html>"
+        assert spa_client.get("/api/ping").json() == {"ok": True}
+        assert spa_client.get("/api/missing").status_code == 404
+    
+    def test_assets_are_immutable(self, spa_client):
+        """Test hashed assets get a long-lived Cache-Control header."""
+        response = spa_client.get("/assets/app-abc123.js")
+        assert response.status_code == 200
+        assert "immutable" in response.headers["cache-control"]
+    
+    def test_cached_static_files_etag_revalidation(self, tmp_path):
+        """Test exhibit-style mounts emit an ETag and answer 304 on match."""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.static_files import CachedStaticFiles, EXHIBIT_CACHE_CONTROL
+        
+        (tmp_path / "q1.png").write_bytes(b"png")
+        static_app = FastAPI()
+        static_app.mount(
+            "/static/exhibits",
+            CachedStaticFiles(directory=str(tmp_path), cache_control=EXHIBIT_CACHE_CONTROL),
+        )
+        test_client = TestClient(static_app)
+        
+        response = test_client.get("/static/exhibits/q1.png")
+        assert response.headers["cache-control"] == EXHIBIT_CACHE_CONTROL
+        etag = response.headers["etag"]
+        assert etag.startswith('"3-')
+        
+        revalidated = test_client.get("/static/exhibits/q1.png", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+
+
+class TestRunImport:
+    """Tests for importing scanned questions."""
+    
+    def test_run_import_bulk_inserts_and_skips_existing(self, client, db):
+        """Test that a re-import skips questions already in the database."""
+        from app.routers import import_router
+        from app.services.parser import get_demo_questions
+        
+        scan = client.post("/api/import/scan").json()
+        assert scan["scan_id"]
+        first = client.post("/api/import/run", json={"scan_id": scan["scan_id"]}).json()
+        assert first["imported"] == 5
+        assert first["total_in_db"] == 5
+        
+        total_by_domain = sum(s.total_questions for s in db.query(DomainStats).all())
+        assert total_by_domain == 5
+        assert db.query(Question).first().times_shown == 0
+        
+        # The scan is consumed by the import
+        again = client.post("/api/import/run", json={"scan_id": scan["scan_id"]})
+        assert again.status_code == 400
+        
+        scan_id = import_router._save_scan(db, demo=True, questions=get_demo_questions(), reports=[])
+        second = client.post("/api/import/run", json={"scan_id": scan_id}).json()
+        assert second == {"imported": 0, "skipped": 5, "total_in_db": 5}
+    
+    def test_run_import_drops_duplicates_within_batch(self, client, db):
+        """Test that repeated stable_ids in one scan are inserted once."""
+        from app.routers import import_router
+        from app.services.parser import get_demo_questions
+        
+        questions = get_demo_questions()
+        scan_id = import_router._save_scan(db, demo=True, questions=questions + questions[:2], reports=[])
+        result = client.post("/api/import/run", json={"scan_id": scan_id}).json()
+        assert result == {"imported": 5, "skipped": 2, "total_in_db": 5}
+        assert sum(s.total_questions for s in db.query(DomainStats).all()) == 5
+    
+    def test_run_import_pages_large_batches(self, client, db, monkeypatch):
+        """Test that imports larger than one insert page are fully written."""
+        from app.routers import import_router
+        from app.services.parser import ParsedQuestion
+        
+        monkeypatch.setattr(import_router, "IMPORT_CHUNK_SIZE", 7)
+        questions = [
+            ParsedQuestion(
+                text=f"Bulk question {i}?",
+                choices=[{"label": "A", "text": "Yes"}, {"label": "B", "text": "No"}],
+                correct_answers=["A"],
+                domain_id="storage",
+            )
+            for i in range(30)
+        ]
+        scan_id = import_router._save_scan(db, demo=True, questions=questions, reports=[])
+        result = client.post("/api/import/run", json={"scan_id": scan_id}).json()
+        assert result == {"imported": 30, "skipped": 0, "total_in_db": 30}
+        assert db.query(DomainStats).filter(DomainStats.domain_id == "storage").one().total_questions == 30
+    
+    def test_report_defaults_to_latest_scan(self, client):
+        """Test that /report finds the stored scan without an explicit id."""
+        scan_id = client.post("/api/import/scan").json()["scan_id"]
+        report = client.get("/api/import/report").json()
+        assert report["has_scan"] is True
+        assert report["scan_id"] == scan_id
+        assert len(report["questions"]) == 5
+
+
+    def test_scan_parses_pdfs_in_background(self, client, db, tmp_path, monkeypatch):
+        """Test that /scan returns immediately and the job result can be polled."""
+        import fitz
+        from app.routers import import_router
+        
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((50, 72), (
+            "QUESTION 1\nWhich storage account replication option should you use?\n"
+            "A. Locally redundant storage\nB. Geo-redundant storage\nAnswer: B\n"
+        ))
+        doc.save(tmp_path / "exam.pdf")
+        monkeypatch.setattr(import_router, "PDFS_DIR", tmp_path)
+        
+        started = client.post("/api/import/scan").json()
+        assert started["status"] == "running"
+        assert started["files_found"] == 1
+        
+        # TestClient runs background tasks before returning the response
+        result = client.get(f"/api/import/scan/{started['scan_id']}").json()
+        assert result["status"] == "done"
+        assert result["total_questions"] == 1
+        assert result["reports"][0]["filename"] == "exam.pdf"
+        
+        report = client.get(f"/api/import/report?scan_id={started['scan_id']}").json()
+        assert report["questions_count"] == 1
+        assert report["reports"][0]["file_hash"]
+    
+    def test_scan_failure_after_parse_marks_error(self, client, db, tmp_path, monkeypatch):
+        """Test that an error while storing the results ends the scan instead of leaving it running."""
+        import fitz
+        from app.routers import import_router
+        
+        doc = fitz.open()
+        doc.new_page().insert_text((50, 72), "QUESTION 1\nWhich option?\nA. One\nB. Two\nAnswer: A\n")
+        doc.save(tmp_path / "exam.pdf")
+        monkeypatch.setattr(import_router, "PDFS_DIR", tmp_path)
+        
+        def broken_payload(*args):
+            raise RuntimeError("payload failed")
+        
+        monkeypatch.setattr(import_router, "_scan_payload", broken_payload)
+        
+        started = client.post("/api/import/scan").json()
+        result = client.get(f"/api/import/scan/{started['scan_id']}").json()
+        assert result["status"] == "error"
+        assert result["error"] == "payload failed"
+    
+    def test_unknown_scan_id_is_404(self, client):
+        """Test polling a scan that does not exist."""
+        assert client.get("/api/import/scan/nope").status_code == 404
+    
+    def test_run_import_adds_to_existing_domain_stats(self, client, db):
+        """Test that imported counts are added onto existing DomainStats rows."""
+        from app.routers import import_router
+        from app.services.parser import get_demo_questions
+        
+        questions = get_demo_questions()
+        domain_id = questions[0].domain_id
+        db.add(DomainStats(domain_id=domain_id, domain_name="Existing", total_questions=10))
+        db.commit()
+        
+        scan_id = import_router._save_scan(db, demo=True, questions=questions, reports=[])
+        client.post("/api/import/run", json={"scan_id": scan_id})
+        
+        db.expire_all()
+        expected = 10 + sum(1 for q in questions if q.domain_id == domain_id)
+        stats = db.query(DomainStats).filter(DomainStats.domain_id == domain_id).one()
+        assert stats.total_questions == expected
+        assert stats.domain_name == "Existing"
+
+
+class TestSessionQuestions:
+    """Tests for loading a session's questions."""
+    
+    def test_session_questions_keep_session_order(self, client, db):
+        """Test questions come back in session order with answers hidden."""
+        from app.models import ExamSession
+        
+        questions = [
+            Question(
+                stable_id=f"order{i}",
+                text=f"Question {i}",
+                choices=[{"label": "A", "text": "Yes"}, {"label": "B", "text": "No"}],
+                correct_answers=["A"],
+                explanation="Because",
+            )
+            for i in range(3)
+        ]
+        db.add_all(questions)
+        db.commit()
+        ids = [questions[2].id, questions[0].id, questions[1].id]
+        
+        session = ExamSession(
+            mode="random",
+            question_ids=ids,
+            answers={str(ids[0]): {"selected": ["B"], "flagged": True}},
+        )
+        db.add(session)
+        db.commit()
+        
+        data = client.get(f"/api/session/{session.id}/questions").json()
+        assert [q["id"] for q in data["questions"]] == ids
+        assert "correct_answers" not in data["questions"][0]
+        assert data["questions"][0]["user_selected"] == ["B"]
+        assert data["questions"][0]["user_flagged"] is True
+    
+    def test_session_results_serialize_datetimes(self, client, db):
+        """Test results for a completed session render timestamps as ISO strings."""
+        from datetime import datetime
+        from app.models import ExamSession
+        
+        question = Question(
+            stable_id="results0",
+            text="Question",
+            choices=[{"label": "A", "text": "Yes"}, {"label": "B", "text": "No"}],
+            correct_answers=["A"],
+        )
+        db.add(question)
+        db.commit()
+        
+        completed = datetime(2024, 5, 1, 12, 30, 0)
+        session = ExamSession(
+            mode="random",
+            question_ids=[question.id],
+            answers={str(question.id): {"selected": ["A"]}},
+            completed_at=completed,
+        )
+        db.add(session)
+        db.commit()
+        
+        data = client.get(f"/api/session/{session.id}/results").json()
+        assert data["session"]["completed_at"] == completed.isoformat()
+        assert data["questions"][0]["is_correct"] is True
+    
+    def test_submit_and_results_load_questions_in_one_query(self, db):
+        """Test grading and results fetch all session questions with a single SELECT."""
+        from sqlalchemy import event
+        from app.models import ExamSession
+        from app.services.session_service import SessionService
+        
+        questions = [
+            Question(
+                stable_id=f"grade{i}",
+                text=f"Question {i}",
+                choices=[{"label": "A", "text": "Yes"}, {"label": "B", "text": "No"}],
+                correct_answers=["A"],
+            )
+            for i in range(3)
+        ]
+        db.add_all(questions)
+        db.commit()
+        ids = [q.id for q in questions] + [9999]  # a deleted question is skipped
+        session = ExamSession(
+            mode="random",
+            question_ids=ids,
+            total_questions=len(ids),
+            answers={str(ids[0]): {"selected": ["A"]}, str(ids[1]): {"selected": ["B"]}},
+        )
+        db.add(session)
+        db.commit()
+        
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            service = SessionService(db)
+            result = service.submit_session(session.id)
+            details = service.get_session_results(session.id)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        
+        assert [r["is_correct"] for r in result["results"]] == [True, False, False]
+        assert result["correct_count"] == 1
+        assert [q["question"]["id"] for q in details["questions"]] == ids[:3]
+        question_selects = [s for s in statements if s.startswith("SELECT") and "FROM questions" in s]
+        assert len(question_selects) == 2
+    
+    @pytest.mark.parametrize("selected, correct, expected", [
+        (["A"], ["A"], True),
+        (["C", "A"], ["A", "C"], True),
+        (["A", "A"], ["A"], True),
+        (["A"], ["A", "C"], False),
+        ([], ["A"], False),
+    ])
+    def test_answer_grading_ignores_order(self, selected, correct, expected):
+        """Test grading compares selected labels as a set."""
+        from app.services.session_service import _is_correct
+        
+        assert _is_correct(selected, correct) is expected
+    
+    def test_series_grouping_samples_standalones(self, db):
+        """Test selection keeps series whole and fills the rest with distinct standalones."""
+        from types import SimpleNamespace
+        from app.services.session_service import SessionService
+        
+        series = [SimpleNamespace(id=100 + i, series_id="s1", sequence_number=5 - i) for i in range(3)]
+        standalone = [SimpleNamespace(id=i, series_id=None, sequence_number=i) for i in range(50)]
+        selected = SessionService(db)._group_and_select_with_series(standalone + series, 10)
+        
+        assert len(selected) == len(set(selected)) == 10
+        assert selected[:3] == [102, 101, 100]
+        assert set(selected[3:]) <= set(range(50))
+        assert len(SessionService(db)._group_and_select_with_series(standalone[:4], 10)) == 4
+    
+    def test_choice_count_kept_in_sync(self, db, monkeypatch):
+        """Test choice_count follows choices and is backfilled for older rows."""
+        from sqlalchemy import text
+        from app import database
+        
+        question = Question(stable_id="count1", text="t", choices=[{"label": "A", "text": "1"}], correct_answers=["A"])
+        assert question.choice_count == 1
+        question.choices = question.choices + [{"label": "B", "text": "2"}]
+        assert question.choice_count == 2
+        db.add(question)
+        db.commit()
+        
+        db.execute(text("UPDATE questions SET choice_count = NULL"))
+        db.commit()
+        monkeypatch.setattr(database, "engine", db.get_bind())
+        database._backfill_choice_counts()
+        db.expire_all()
+        assert db.query(Question).one().choice_count == 2
+    
+    def test_weak_areas_ranked_in_sql(self, db):
+        """Test weak-area selection ranks by inverted accuracy and skips unusable questions."""
+        from app.services.session_service import SessionService
+        
+        db.add(DomainStats(domain_id="storage", domain_name="Storage", total_shown=10, total_correct=9))
+        two = [{"label": "A", "text": "Yes"}, {"label": "B", "text": "No"}]
+        rows = [
+            ("weak-strong-domain", "storage", 0, 0, two),
+            ("weak-missed", "storage", 4, 0, two),
+            ("weak-no-stats", "compute", 0, 0, two),
+            ("weak-one-choice", "compute", 0, 0, two[:1]),
+        ]
+        for stable_id, domain, shown, correct, choices in rows:
+            db.add(Question(
+                stable_id=stable_id, text=stable_id, choices=choices, correct_answers=["A"],
+                domain_id=domain, times_shown=shown, times_correct=correct,
+            ))
+        db.add(Question(stable_id="weak-study", text="study", choices=two, correct_answers=["A"], question_type="study"))
+        db.commit()
+        
+        service = SessionService(db)
+        ranked = []
+        service._group_and_select_with_series = lambda questions, count: ranked.extend(questions) or []
+        service._select_weak_areas(10)
+        ids = {q.stable_id: q.id for q in db.query(Question).all()}
+        # missed: (0.1 + 1.0) / 2, no stats: 0.5, strong domain: max(0.1, 1 - 0.9)
+        assert [q.id for q in ranked] == [ids["weak-missed"], ids["weak-no-stats"], ids["weak-strong-domain"]]
+    
+    def test_submit_adds_domain_stats_per_domain(self, db):
+        """Test grading adds each domain's shown/correct totals in one update."""
+        from sqlalchemy import event
+        from app.models import ExamSession
+        from app.services.session_service import SessionService
+        
+        db.add_all([
+            DomainStats(domain_id="storage", domain_name="Storage", total_shown=4, total_correct=1),
+            DomainStats(domain_id="compute", domain_name="Compute"),
+        ])
+        questions = [
+            Question(
+                stable_id=f"dom{i}",
+                text=f"Question {i}",
+                choices=[{"label": "A", "text": "Yes"}, {"label": "B", "text": "No"}],
+                correct_answers=["A"],
+                domain_id=domain,
+            )
+            for i, domain in enumerate(["storage", "storage", "compute", "storage", None])
+        ]
+        db.add_all(questions)
+        db.commit()
+        ids = [q.id for q in questions]
+        session = ExamSession(
+            mode="random",
+            question_ids=ids,
+            total_questions=len(ids),
+            answers={str(qid): {"selected": [pick]} for qid, pick in zip(ids, "ABAAA")},
+        )
+        db.add(session)
+        db.commit()
+        
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            SessionService(db).submit_session(session.id)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        
+        assert sum(st.startswith("UPDATE domain_stats") for st in statements) == 1
+        stats = {s.domain_id: (s.total_shown, s.total_correct) for s in db.query(DomainStats).all()}
+        assert stats == {"storage": (7, 3), "compute": (1, 1)}
+    
+    def test_navigator_statuses(self, client, db):
+        """Test navigator status for answered, flagged and untouched questions."""
+        from app.models import ExamSession
+        
+        session = ExamSession(
+            mode="random",
+            question_ids=[1, 2, 3, 4],
+            answers={
+                "1": {"selected": ["A"], "flagged": False},
+                "2": {"selected": [], "flagged": True},
+                "3": {"selected": ["B"], "flagged": True},
+            },
+        )
+        db.add(session)
+        db.commit()
+        
+        data = client.get(f"/api/session/{session.id}/navigator").json()
+        assert [s["status"] for s in data["statuses"]] == [
+            "answered", "flagged", "answered_flagged", "unanswered",
+        ]
+        assert (data["answered"], data["flagged"], data["total"]) == (2, 2, 4)
+    
+    def test_record_answer_maintains_counts(self, client, db):
+        """Test that answering and re-answering keeps the stored counts in step."""
+        from app.models import ExamSession
+        
+        session = ExamSession(mode="random", question_ids=[1, 2, 3], answers={})
+        db.add(session)
+        db.commit()
+        
+        def answer(qid, selected, flagged=False):
+            client.post(
+                f"/api/session/answer?session_id={session.id}",
+                json={"question_id": qid, "selected": selected, "flagged": flagged},
+            )
+        
+        answer(1, ["A"])
+        answer(2, [], flagged=True)
+        answer(3, ["B"], flagged=True)
+        answer(3, [], flagged=False)
+        
+        db.refresh(session)
+        assert (session.answered_count, session.flagged_count) == (1, 1)
+        
+        data = client.get(f"/api/session/{session.id}/navigator?include_statuses=false").json()
+        assert "statuses" not in data
+        assert (data["answered"], data["flagged"], data["total"]) == (1, 1, 3)
+        
+        timer = client.get(f"/api/session/{session.id}/time").json()
+        assert (timer["answered"], timer["flagged"]) == (1, 1)
@@ -0,0 +1,129 @@
+"""Tests for authentication utilities."""
+import time
+
+import anyio
+import jwt
+import pytest
+from passlib.hash import bcrypt
+
+from app import auth
+from app.auth import create_access_token, decode_token
+
+
+class TestDecodeToken:
+    """Tests for JWT decoding."""
+
+    def test_decode_valid_token(self):
+        """Test that a freshly issued token decodes to its claims."""
+        token = create_access_token(42, "user@example.com")
+        payload = decode_token(token)
+        assert payload["sub"] == "42"
+        assert payload["email"] == "user@example.com"
+
+    def test_decode_invalid_token(self):
+        """Test that a malformed token is rejected."""
+        assert decode_token("not-a-jwt") is None
+
+    def test_decoded_token_is_cached(self):
+        """Test that repeated decodes are served from the token cache."""
+        token = create_access_token(7, "cached@example.com")
+        first = decode_token(token)
+        second = decode_token(token)
+        assert first is second
+        assert len(auth._token_cache) > 0
+
+    def test_fast_decode_matches_pyjwt(self):
+        """Test that the HS256 fast path agrees with PyJWT for issued tokens."""
+        token = create_access_token(5, "fast@example.com")
+        assert auth._fast_decode(token) == jwt.decode(token, **auth._DECODE_KWARGS)
+
+    def test_fast_decode_rejects_tampered_and_expired(self):
+        """Test that bad signatures and past exp claims are rejected."""
+        token = create_access_token(5, "fast@example.com")
+        header, payload, signature = token.split(".")
+        forged = jwt.encode({"sub": "6", "exp": time.time() + 60}, "other-key", algorithm="HS256")
+        assert auth._fast_decode(f"{header}.{payload}.{forged.split('.')[2]}") is None
+
+        expired = jwt.encode({"sub": "5", "exp": time.time() - 1}, auth.JWT_SECRET_KEY, algorithm="HS256")
+        assert auth._fast_decode(expired) is None
+        assert decode_token(expired) is None
+
+
+class TestPasswordVerification:
+    """Tests for password hashing and verification."""
+
+    def test_fast_verifier_disabled_without_pepper(self, monkeypatch):
+        """Test that no fast verifier is derived when AUTH_PEPPER is unset."""
+        monkeypatch.setattr(auth, "AUTH_PEPPER", None)
+        assert auth.get_password_fast_hash("secret123") is None
+
+    def test_fast_verifier_accepts_matching_password(self, monkeypatch):
+        """Test that a matching fast verifier short-circuits bcrypt."""
+        monkeypatch.setattr(auth, "AUTH_PEPPER", "pepper")
+        fast_hash = auth.get_password_fast_hash("secret123")
+        assert auth.verify_password("secret123", "not-a-bcrypt-hash", fast_hash)
+
+    def test_fast_verifier_miss_falls_back_to_bcrypt(self, monkeypatch):
+        """Test that a stale fast verifier falls back to the durable hash."""
+        monkeypatch.setattr(auth, "AUTH_PEPPER", "pepper")
+        hashed = auth.get_password_hash("secret123")
+        stale = auth.get_password_fast_hash("old-password")
+        assert auth.verify_password("secret123", hashed, stale)
+        assert not auth.verify_password("wrong-pass", hashed, stale)
+
+    def test_new_hashes_use_argon2(self):
+        """Test that new passwords are hashed with Argon2id."""
+        hashed = auth.get_password_hash("secret123")
+        assert hashed.startswith("$argon2id$")
+        assert not auth.password_needs_rehash(hashed)
+
+    def test_legacy_bcrypt_hash_verifies_and_needs_rehash(self):
+        """Test that bcrypt hashes still verify but are flagged for migration."""
+        legacy = bcrypt.hash("secret123")
+        assert auth.verify_password("secret123", legacy)
+        assert auth.password_needs_rehash(legacy)
+
+    def test_async_helpers_match_sync(self):
+        """Test that the threadpool wrappers hash and verify like the sync helpers."""
+        async def roundtrip():
+            hashed = await auth.aget_password_hash("secret123")
+            return (
+                await auth.averify_password("secret123", hashed),
+                await auth.averify_password("wrong-pass", hashed),
+            )
+
+        assert anyio.run(roundtrip) == (True, False)
+
+
+class TestBearerToken:
+    """Tests for Authorization header parsing."""
+
+    @pytest.mark.parametrize("header, expected", [
+        ("Bearer abc.def.ghi", "abc.def.ghi"),
+        ("bearer abc", "abc"),
+        ("Basic dXNlcjpwYXNz", None),
+        ("Bearer ", None),
+        (None, None),
+    ])
+    def test_bearer_token(self, header, expected):
+        """Test that only non-empty Bearer credentials are extracted."""
+        from starlette.requests import Request
+
+        headers = [(b"authorization", header.encode())] if header else []
+        request = Request({"type": "http", "headers": headers})
+        assert auth.bearer_token(request) == expected
+
+    def test_me_requires_bearer_token(self, client):
+        """Test that /me accepts a bearer token and rejects other schemes."""
+        response = client.post("/api/auth/register", json={
+            "email": "bearer@example.com",
+            "password": "secret123",
+        })
+        token = response.json()["access_token"]
+
+        ok = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert ok.status_code == 200
+        assert ok.json()["email"] == "bearer@example.com"
+
+        rejected = client.get("/api/auth/me", headers={"Authorization": f"Token {token}"})
+        assert rejected.status_code == 401
@@ -4,49 +4,106 @@ from app.services.parser import PDFParser, ParsedQuestion, get_demo_questions
 from app.services.domain_classifier import DomainClassifier, get_classifier
 
 
+@pytest.fixture(scope="module")
+def classifier():
+    """Shared domain classifier."""
+    return get_classifier()
+
+
+@pytest.fixture(scope="module")
+def parser():
+    """Shared PDF parser for tests that don't change its state."""
+    return PDFParser()
+
+
 class TestDomainClassifier:
     """Tests for domain classification."""
     
-    def test_classify_storage_question(self):
-        """Test classification of storage-related questions."""
-        classifier = get_classifier()
-        text = "Which storage redundancy option should you use for blob containers?"
-        domain = classifier.classify(text)
-        assert domain == "storage"
+    @pytest.mark.parametrize("text, expected", [
+        ("Which storage redundancy option should you use for blob containers?", "storage"),
+        ("You need to deploy a virtual machine with high availability.", "compute"),
+        ("Configure the network security group to allow traffic on port 443.", "networking"),
+        ("Set up Azure Monitor alerts for the backup policy.", "monitoring"),
+        ("You need to configure RBAC role assignments for users in Azure AD.", "identity-governance"),
+    ], ids=["storage", "compute", "networking", "monitoring", "identity"])
+    def test_classify(self, classifier, text, expected):
+        """Test classification of questions from each domain."""
+        assert classifier.classify(text) == expected
     
-    def test_classify_compute_question(self):
-        """Test classification of compute-related questions."""
+    def test_overlapping_keywords_each_score(self):
+        """Test that a keyword nested in a longer one still counts on its own."""
         classifier = get_classifier()
-        text = "You need to deploy a virtual machine with high availability."
-        domain = classifier.classify(text)
-        assert domain == "compute"
+        domains = dict(classifier._keyword_domains)
+        assert "policy" in domains and "backup policy" in domains
+        text = "Configure the backup policy."
+        assert classifier.classify(text) == domains["backup policy"][0]
     
-    def test_classify_networking_question(self):
-        """Test classification of networking-related questions."""
-        classifier = get_classifier()
-        text = "Configure the network security group to allow traffic on port 443."
-        domain = classifier.classify(text)
-        assert domain == "networking"
+    def test_config_parse_is_cached(self, tmp_path):
+        """Test that the domains config is re-parsed only after it changes."""
+        import os
+        from app.services import domain_classifier
+        
+        path = tmp_path / "domains.json"
+        path.write_bytes(b'{"domains": [{"id": "a", "name": "A"}]}')
+        first = domain_classifier._read_config(path)
+        assert domain_classifier._read_config(path) is first
+        
+        path.write_bytes(b'{"domains": [{"id": "b", "name": "B"}]}')
+        os.utime(path, ns=(0, 1))
+        assert domain_classifier._read_config(path)["domains"][0]["id"] == "b"
+        assert domain_classifier._read_config(tmp_path / "missing.json") is None
     
-    def test_classify_monitoring_question(self):
-        """Test classification of monitoring-related questions."""
+    def test_classify_batch_matches_classify(self):
+        """Test that batch classification agrees with per-text classification."""
         classifier = get_classifier()
-        text = "Set up Azure Monitor alerts for the backup policy."
-        domain = classifier.classify(text)
-        assert domain == "monitoring"
+        texts = [
+            "Which storage redundancy option should you use for blob containers?",
+            "You need to deploy a virtual machine with high availability.",
+            "",
+            "Set up Azure Monitor alerts for the backup policy.",
+            "No keywords here at all",
+        ]
+        assert classifier.classify_batch(texts) == [classifier.classify(t) for t in texts]
+        assert classifier.classify_batch([]) == []
     
-    def test_classify_identity_question(self):
-        """Test classification of identity-related questions."""
-        classifier = get_classifier()
-        text = "You need to configure RBAC role assignments for users in Azure AD."
-        domain = classifier.classify(text)
-        assert domain == "identity-governance"
+    def test_classify_batch_non_ascii_offsets(self):
+        """Test that texts whose lowercase is longer don't shift later matches."""
+        from app.services.domain_classifier import DomainClassifier
+        
+        classifier = DomainClassifier()
+        texts = [
+            "İ" * 40 + " virtual network subnet NSG peering vnet",
+            "what is the capital",
+            "ẞ Which storage redundancy option should you use for blob containers?",
+        ]
+        assert classifier.classify_batch(texts) == [classifier.classify(t) for t in texts]
+    
+    def test_classify_batch_reuses_results(self, monkeypatch):
+        """Test that repeated texts are scored only once across batches."""
+        from app.services.domain_classifier import DomainClassifier
+        
+        classifier = DomainClassifier()
+        scored = []
+        score_batch = classifier._score_batch
+        monkeypatch.setattr(classifier, "_score_batch", lambda texts: scored.extend(texts) or score_batch(texts))
+        
+        text = "Which storage redundancy option should you use for blob containers?"
+        assert classifier.classify_batch([text, text]) == ["storage", "storage"]
+        assert classifier.classify_batch([text]) == ["storage"]
+        assert scored == [text]
     
     def test_get_domain_name(self):
         """Test getting domain names."""
         classifier = get_classifier()
         name = classifier.get_domain_name("storage")
         assert name == "Implement and manage storage"
+    
+    def test_unknown_domain_lookup(self):
+        """Test that unknown domain ids fall back to the id itself."""
+        classifier = get_classifier()
+        assert classifier.get_domain_name("no-such-domain") == "no-such-domain"
+        assert classifier.is_known_domain("storage")
+        assert not classifier.is_known_domain("no-such-domain")
 
 
 class TestParsedQuestion:
@@ -66,6 +123,56 @@ class TestParsedQuestion:
         )
         assert q1.stable_id == q2.stable_id
     
+    def test_stable_id_format_is_unchanged(self):
+        """Test that stable IDs keep the SHA-256 prefix stored by past imports."""
+        import hashlib
+        
+        q = ParsedQuestion(
+            text="Test question?",
+            choices=[{"label": "A", "text": "Answer A"}, {"label": "B", "text": "Answer B"}],
+            correct_answers=["A"]
+        )
+        expected = hashlib.sha256(b"Test question?|Answer A|Answer B").hexdigest()[:16]
+        assert q.stable_id == expected
+    
+    def test_stable_id_recomputed_after_edit(self):
+        """Test that the cached stable ID follows edits to text and choices."""
+        q = ParsedQuestion(
+            text="Test question?",
+            choices=[{"label": "A", "text": "Answer A"}],
+            correct_answers=["A"]
+        )
+        original = q.stable_id
+        assert q.stable_id is original
+        
+        q.text = "Edited question?"
+        edited = q.stable_id
+        assert edited != original
+        q.choices = [{"label": "A", "text": "Answer B"}]
+        assert q.stable_id not in (original, edited)
+    
+    def test_slots_keep_asdict_round_trip(self):
+        """Test that slotted questions have no __dict__ and rebuild from asdict()."""
+        from dataclasses import asdict
+        
+        q = ParsedQuestion(
+            text="Test question?",
+            choices=[{"label": "A", "text": "Answer A"}],
+            correct_answers=["A"]
+        )
+        stable_id = q.stable_id
+        assert not hasattr(q, "__dict__")
+        assert "_stable_id" not in asdict(q)
+        assert ParsedQuestion(**asdict(q)).stable_id == stable_id
+    
+    def test_to_dict_matches_asdict_without_copying(self):
+        """Test that to_dict() has asdict()'s contents but shares the choice dicts."""
+        from dataclasses import asdict
+        
+        q = get_demo_questions()[0]
+        assert q.to_dict() == asdict(q)
+        assert q.to_dict()["choices"][0] is q.choices[0]
+    
     def test_is_valid(self):
         """Test validation of parsed questions."""
         valid = ParsedQuestion(
@@ -105,52 +212,243 @@ class TestDemoQuestions:
         demos = get_demo_questions()
         domains = {q.domain_id for q in demos}
         assert len(domains) >= 3  # At least 3 different domains
+    
+    def test_demo_questions_built_once(self):
+        """Test that repeated calls share the questions but not the list."""
+        first, second = get_demo_questions(), get_demo_questions()
+        assert first is not second
+        assert all(a is b for a, b in zip(first, second))
 
 
 class TestPDFParser:
     """Tests for PDF parser functionality."""
     
-    def test_determine_single_type(self):
-        """Test single-select question type detection."""
+    @pytest.mark.parametrize("question_text, choice_texts, expected", [
+        ("Which option should you choose?", ["Option A", "Option B", "Option C"], "single"),
+        ("Select all that apply. Which two options?", ["Option A", "Option B"], "multi"),
+        ("Is this statement correct?", ["True", "False"], "truefalse"),
+    ], ids=["single", "multi", "truefalse"])
+    def test_determine_type(self, parser, question_text, choice_texts, expected):
+        """Test question type detection."""
+        choices = [{"label": label, "text": text} for label, text in zip("ABC", choice_texts)]
+        assert parser._determine_type(question_text, choices) == expected
+    
+    def test_split_into_blocks_formats(self):
+        """Test that each block marker format is detected."""
         parser = PDFParser()
-        choices = [
-            {"label": "A", "text": "Option A"},
-            {"label": "B", "text": "Option B"},
-            {"label": "C", "text": "Option C"},
+        assert parser._split_into_blocks("Q1\nFirst?\nQ2\nSecond?") == ["Q1\nFirst?", "Q2\nSecond?"]
+        assert parser._split_into_blocks("Intro QUESTION 1 First? Question 2 Second?") == [
+            "Intro", "QUESTION 1 First?", "Question 2 Second?",
         ]
-        qtype = parser._determine_type("Which option should you choose?", choices)
-        assert qtype == "single"
+        assert parser._split_into_blocks("1. First?\n2) Second?") == ["1. First?", "2) Second?"]
+    
+    def test_extract_choices_adjacent_markers(self):
+        """Test that a choice marker right after the previous choice's punctuation is found."""
+        parser = PDFParser()
+        choices = parser._extract_choices("Which one?\nA) Yes.B) No\nAnswer: A")
+        assert choices == [{"label": "A", "text": "Yes"}, {"label": "B", "text": "No"}]
+    
+    def test_last_choice_stops_at_answers_marker(self):
+        """Test that a plural "Answers:" line is not folded into the last choice."""
+        parser = PDFParser()
+        choices = parser._extract_choices("Pick two.\nA. First option\nB. Second option\nAnswers: A, B")
+        assert choices[-1] == {"label": "B", "text": "Second option"}
+    
+    @pytest.mark.parametrize("block, expected", [
+        ("Question text\nA. Option A\nB. Option B\nAnswer: B", ["B"]),
+        ("Question text\nCorrect Answers: A, C", ["A", "C"]),
+    ], ids=["single", "multiple"])
+    def test_extract_answers(self, parser, block, expected):
+        """Test extracting single and multiple correct answers."""
+        assert parser._extract_answers(block) == expected
     
-    def test_determine_multi_type(self):
-        """Test multi-select question type detection."""
+    def test_extract_answers_priority_and_missing(self):
+        """Test that earlier answer formats win and blocks without one return nothing."""
         parser = PDFParser()
-        choices = [
-            {"label": "A", "text": "Option A"},
-            {"label": "B", "text": "Option B"},
+        assert parser._extract_answers("Correct Answer: A is right. ANSWER: b\n") == ["B"]
+        assert parser._extract_answers("Question text\nA. Yes\nB. No") == []
+    
+    def test_find_pdf_page_uses_normalized_pages(self):
+        """Test that page lookup matches across line breaks and case."""
+        parser = PDFParser()
+        pages = parser._normalize_pages({
+            1: "Cover page",
+            2: "You have an Azure\nsubscription   named Sub1.",
+        })
+        assert parser._find_pdf_page_for_question("you have an azure subscription named Sub1.", pages) == 2
+        assert parser._find_pdf_page_for_question("Not in the document", pages) == 0
+        
+        pages = parser._normalize_pages({1: "alpha beta", 2: "gamma", 3: "gamma again"})
+        assert parser._find_pdf_page_for_question("Gamma", pages) == 2
+        # A match spanning the page separator doesn't count
+        assert parser._find_pdf_page_for_question("beta\x00gamma", pages) == 0
+        # Exam PDFs repeat questions; the earliest page wins
+        pages = parser._normalize_pages({1: "intro", 2: "Q1 You have VM1.", 3: "Q9 You have VM1."})
+        assert parser._find_pdf_page_for_question("You have VM1.", pages) == 2
+    
+    @pytest.mark.parametrize("text", ["", " ", "\n\t", "a", " a b ", "a\n\n b\t", "\u00a0x\u2028y "])
+    def test_collapse_whitespace_matches_regex(self, text):
+        """Test that the split-based collapse keeps the regex's edge spaces."""
+        parser = PDFParser()
+        assert parser._collapse_whitespace(text) == parser.WHITESPACE_RE.sub(' ', text)
+    
+    def test_detect_question_series(self, monkeypatch):
+        """Test that marked series pick up unmarked questions with the same scenario."""
+        parser = PDFParser()
+        note = "Note: This question is part of a series of questions. "
+        scenario = "You have an Azure subscription named Sub1 that contains VM1."
+        questions = [
+            ParsedQuestion(f"{note}{scenario} Solution: Add a tag. Does that meet the goal?", [], []),
+            ParsedQuestion(f"{scenario} Solution: Resize VM1. Does that meet the goal?", [], []),
+            ParsedQuestion("You have a storage account named st1. What should you use?", [], []),
         ]
-        qtype = parser._determine_type("Select all that apply. Which two options?", choices)
-        assert qtype == "multi"
+        parser._detect_question_series(questions)
+        assert questions[0].series_id and len(questions[0].series_id) == 12
+        assert questions[1].series_id == questions[0].series_id
+        assert questions[2].series_id is None
+        
+        # Without any marked question the scenarios aren't extracted at all
+        calls = []
+        monkeypatch.setattr(parser, "_extract_core_scenario", lambda text: calls.append(text) or text)
+        parser._detect_question_series([ParsedQuestion(scenario, [], []), ParsedQuestion(scenario, [], [])])
+        assert calls == []
+    
+    def test_fix_word_spacing_concatenations(self):
+        """Test that concatenated words are split, including chained ones."""
+        parser = PDFParser()
+        assert parser._fix_word_spacing("Youneed tocreate qs inthe portal") == "You need to create questions in the portal"
+        assert parser._fix_word_spacing("doyouneed Whatshouldyou") == "do you need What should you"
+        assert parser._fix_word_spacing("QSETS and qset") == "question sets and question set"
+        assert parser._fix_word_spacing("Café  qs\tinthe portal ") == "Café questions in the portal"
+        assert parser._fix_word_spacing("A well spaced sentence.") == "A well spaced sentence."
+        assert parser._fix_word_spacing.cache_info().hits == 0
+        parser._fix_word_spacing("Youneed tocreate qs inthe portal")
+        assert parser._fix_word_spacing.cache_info().hits == 1
     
-    def test_determine_truefalse_type(self):
-        """Test true/false question type detection."""
+    def test_tables_only_analyzed_on_pages_with_drawings(self, monkeypatch):
+        """Test that ruled tables are extracted and plain text pages skip find_tables."""
+        import fitz
+        
+        doc = fitz.open()
+        page = doc.new_page()
+        for row in range(4):
+            page.draw_line((72, 80 + row * 20), (372, 80 + row * 20))
+        for col in range(3):
+            page.draw_line((72 + col * 150, 80), (72 + col * 150, 140))
+        for row, cells in enumerate([("Name", "Role"), ("User1", "Owner"), ("User2", "Reader")]):
+            for col, cell in enumerate(cells):
+                page.insert_text((77 + col * 150, 94 + row * 20), cell)
+        doc.new_page().insert_text((72, 72), "No table here")
+        
         parser = PDFParser()
-        choices = [
-            {"label": "A", "text": "True"},
-            {"label": "B", "text": "False"},
+        tables = parser._extract_tables_from_page(doc[0])
+        assert len(tables) == 1 and "| User1 | Owner  |" in tables[0]
+        
+        monkeypatch.setattr(fitz.Page, "find_tables", lambda self, *a, **kw: pytest.fail("find_tables called"))
+        assert parser._extract_tables_from_page(doc[1]) == []
+    
+    def test_exhibit_hint_words_cover_keywords(self):
+        """Test that the exhibit pre-check can't skip a question a keyword would match."""
+        for keyword in PDFParser.EXHIBIT_KEYWORDS + PDFParser.TABLE_KEYWORDS:
+            assert any(word in keyword for word in PDFParser.EXHIBIT_HINT_WORDS), keyword
+    
+    def test_exhibits_linked_for_questions_sharing_pages(self, tmp_path, monkeypatch):
+        """Test that neighbouring exhibit questions each get the page image saved."""
+        import io
+        import os
+        import fitz
+        from PIL import Image
+        
+        image = io.BytesIO()
+        Image.frombytes("RGB", (400, 100), os.urandom(400 * 100 * 3)).save(image, "PNG")
+        pdf = tmp_path / "exhibits.pdf"
+        doc = fitz.open()
+        texts = {}
+        for i in (1, 2):
+            page = doc.new_page()
+            texts[i] = f"Question {i}: review the following exhibit."
+            page.insert_text((72, 72), texts[i])
+        doc[0].insert_image(fitz.Rect(72, 100, 472, 200), stream=image.getvalue())
+        doc.save(pdf)
+        doc.close()
+        
+        parser = PDFParser(exhibits_dir=tmp_path / "exhibits")
+        questions = [
+            ParsedQuestion(text=texts[i], choices=[{"label": "A", "text": str(i)}], correct_answers=["A"], source_page=i)
+            for i in (1, 2)
         ]
-        qtype = parser._determine_type("Is this statement correct?", choices)
-        assert qtype == "truefalse"
+        extracted = []
+        extract_image = fitz.Document.extract_image
+        monkeypatch.setattr(fitz.Document, "extract_image", lambda doc, xref: extracted.append(xref) or extract_image(doc, xref))
+        parser._extract_and_link_images(pdf, questions, texts)
+        # Scored once, saved once: the second question reuses the bytes
+        assert len(extracted) == 2
+        saved = []
+        for q in questions:
+            assert q.exhibit_image.startswith(f"/static/exhibits/q{q.source_page}_")
+            saved.append((tmp_path / "exhibits" / q.exhibit_image.rsplit("/", 1)[1]).read_bytes())
+        assert saved[0] == saved[1] and len(saved[0]) > 5000
     
-    def test_extract_answers_single(self):
-        """Test extracting single correct answer."""
+    def test_extracted_size_bound_only_for_png_output(self):
+        """Test that only images extracted as PNG get a size bound from the image list."""
         parser = PDFParser()
-        block = "Question text\nA. Option A\nB. Option B\nAnswer: B"
-        answers = parser._extract_answers(block)
-        assert answers == ["B"]
+        assert parser._extracted_size_bound((5, 0, 16, 16, 8, "DeviceRGB", "", "Im0", "FlateDecode", 0)) < parser.MIN_IMAGE_BYTES
+        assert parser._extracted_size_bound((5, 0, 400, 100, 8, "DeviceRGB", "", "Im0", "", 0)) > 400 * 100 * 3
+        # JPEG streams and ICC profiles aren't bounded by the pixel count
+        assert parser._extracted_size_bound((5, 0, 16, 16, 8, "DeviceRGB", "", "Im0", "DCTDecode", 0)) is None
+        assert parser._extracted_size_bound((5, 0, 16, 16, 8, "ICCBased", "DeviceRGB", "Im0", "", 0)) is None
     
-    def test_extract_answers_multiple(self):
-        """Test extracting multiple correct answers."""
+    def test_page_parallel_extraction_matches_sequential(self, tmp_path):
+        """Test that splitting pages across processes keeps text and page order."""
+        import fitz
+        from app.services import parser as parser_module
+        
+        pdf = tmp_path / "pages.pdf"
+        doc = fitz.open()
+        for i in range(1, 2 * parser_module.MIN_PAGES_PER_WORKER + 1):
+            doc.new_page().insert_text((72, 72), f"Question {i} text on page {i}")
+        doc.save(pdf)
+        doc.close()
+        
         parser = PDFParser()
-        block = "Question text\nCorrect Answers: A, C"
-        answers = parser._extract_answers(block)
-        assert set(answers) == {"A", "C"}
+        sequential = parser._extract_text(pdf)
+        parallel = parser._extract_text(pdf, page_workers=2)
+        assert list(parallel) == list(sequential) == list(range(1, 17))
+        assert parallel == sequential
+
+class TestFileHash:
+    """Tests for PDF file hashing."""
+    
+    def test_file_hash_cached_until_file_changes(self, tmp_path):
+        """Test that hashes are reused for unchanged files and refreshed on change."""
+        import hashlib
+        import os
+        from app.routers import import_router
+        
+        pdf = tmp_path / "exam.pdf"
+        pdf.write_bytes(b"%PDF-1.4 first")
+        parser = PDFParser(exhibits_dir=tmp_path / "exhibits")
+        
+        first = import_router._file_hashes(parser, [pdf])[0]
+        assert first == hashlib.sha256(b"%PDF-1.4 first").hexdigest()
+        assert import_router._file_hashes(parser, [pdf])[0] == first
+        
+        pdf.write_bytes(b"%PDF-1.4 second!")
+        os.utime(pdf, ns=(0, 1))
+        assert import_router._file_hashes(parser, [pdf])[0] == hashlib.sha256(b"%PDF-1.4 second!").hexdigest()
+    
+    def test_file_hashes_parallel_keep_order(self, tmp_path):
+        """Test that batch hashing returns SHA256 digests in input order."""
+        import hashlib
+        from app.routers import import_router
+        
+        parser = PDFParser(exhibits_dir=tmp_path / "exhibits")
+        pdfs = []
+        for i in range(5):
+            pdf = tmp_path / f"exam{i}.pdf"
+            pdf.write_bytes(b"%PDF-1.4 " + bytes([i]) * 4096)
+            pdfs.append(pdf)
+        
+        expected = [hashlib.sha256(p.read_bytes()).hexdigest() for p in pdfs]
+        assert import_router._file_hashes(parser, pdfs) == expected
+        assert import_router._file_hashes(parser, pdfs[::-1]) == expected[::-1]
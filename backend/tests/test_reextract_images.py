@@ -0,0 +1,111 @@
+"""Tests for the exhibit re-extraction script."""
+import importlib.util
+import io
+import os
+import queue
+from pathlib import Path
+from types import SimpleNamespace
+
+import fitz
+import pytest
+from PIL import Image
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "reextract_images.py"
+
+TEXTS = (
+    "Question 1: The subscription contains the following users.",
+    "Question 2: Review the exhibit before answering.",
+    "Question 3: Refer to the exhibit on the previous page.",
+)
+
+
+@pytest.fixture(scope="module")
+def script():
+    """The script loaded as a module, without running main()."""
+    spec = importlib.util.spec_from_file_location("reextract_images", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _png(width: int, height: int) -> bytes:
+    """Incompressible PNG, so its extracted size tracks the pixel count."""
+    image = io.BytesIO()
+    Image.frombytes("RGB", (width, height), os.urandom(width * height * 3)).save(image, "PNG")
+    return image.getvalue()
+
+
+@pytest.fixture(scope="module")
+def doc():
+    """Three pages: a wide table-like image, a large square image plus an icon, no image."""
+    doc = fitz.open()
+    for text in TEXTS:
+        doc.new_page().insert_text((72, 72), text)
+    doc[0].insert_image(fitz.Rect(72, 100, 472, 200), stream=_png(600, 150))
+    doc[1].insert_image(fitz.Rect(72, 100, 392, 420), stream=_png(320, 320))
+    doc[1].insert_image(fitz.Rect(72, 440, 88, 456), stream=_png(16, 16))
+    yield doc
+    doc.close()
+
+
+class TestFindPdfPage:
+    """Tests for locating a question's PDF page."""
+
+    @pytest.mark.parametrize("text, hint_page, expected", [
+        (TEXTS[1], 0, 2),
+        (TEXTS[2], 1, 3),
+        (TEXTS[0], 3, 1),
+        ("Question 4: not in this PDF.", 2, 0),
+    ], ids=["no-hint", "in-window", "outside-window", "missing"])
+    def test_find_pdf_page_for_question(self, script, doc, text, hint_page, expected):
+        """Test that hinted lookups fall back to the whole document."""
+        page_texts = script.load_page_texts(doc)
+        assert script.find_pdf_page_for_question(text, page_texts, hint_page=hint_page) == expected
+
+
+class TestExtractImage:
+    """Tests for choosing and saving a question's exhibit."""
+
+    @pytest.mark.parametrize("index, pdf_page, expected_suffix", [
+        (0, 1, "_img0_0.png"),
+        (1, 2, "_img1_0.png"),
+        (2, 3, "_img1_0.png"),
+    ], ids=["table-expected", "largest", "previous-page"])
+    def test_extract_image_for_question(self, script, doc, tmp_path, monkeypatch, index, pdf_page, expected_suffix):
+        """Test that the best-scoring candidate is saved through the writer queue."""
+        monkeypatch.setattr(script, "EXHIBITS_DIR", tmp_path)
+        question = SimpleNamespace(id=index + 1, text=TEXTS[index], stable_id="abcdef123456", source_page=index + 1)
+        writes = queue.Queue()
+        url = script.extract_image_for_question(doc, pdf_page, question, {}, {}, writes)
+        assert url == f"/static/exhibits/q{index + 1}_abcdef12{expected_suffix}"
+
+        writes.put(None)
+        failed = set()
+        script.image_writer(writes, failed)
+        assert not failed
+        assert (tmp_path / url.rsplit("/", 1)[1]).stat().st_size > 5000
+
+    def test_failed_writes_are_reported(self, script, tmp_path):
+        """Test that the writer records files it couldn't write instead of dropping them silently."""
+        writes = queue.Queue()
+        writes.put((tmp_path / "missing-dir" / "q1_img.png", b"png"))
+        writes.put((tmp_path / "q2_img.png", b"png"))
+        writes.put(None)
+        failed = set()
+        script.image_writer(writes, failed)
+        assert failed == {"q1_img.png"}
+        assert (tmp_path / "q2_img.png").read_bytes() == b"png"
+
+    def test_caches_page_images_and_metadata(self, script, doc, tmp_path, monkeypatch):
+        """Test that a second question on the same pages decodes only the saved image."""
+        monkeypatch.setattr(script, "EXHIBITS_DIR", tmp_path)
+        image_info, page_images = {}, {}
+        questions = [SimpleNamespace(id=i, text=TEXTS[1], stable_id=None, source_page=i) for i in (1, 2)]
+        script.extract_image_for_question(doc, 2, questions[0], image_info, page_images, queue.Queue())
+        assert sorted(page_images) == [0, 1, 2]
+
+        extracted = []
+        extract_image = fitz.Document.extract_image
+        monkeypatch.setattr(fitz.Document, "extract_image", lambda d, xref: extracted.append(xref) or extract_image(d, xref))
+        script.extract_image_for_question(doc, 2, questions[1], image_info, page_images, queue.Queue())
+        assert len(extracted) == 1
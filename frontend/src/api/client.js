@@ -36,11 +36,12 @@ async function request(endpoint, options = {}) {
 export const importApi = {
   getStatus: () => request('/import/status'),
   scan: () => request('/import/scan', { method: 'POST' }),
-  run: (edits = []) => request('/import/run', { 
+  getScan: (scanId) => request(`/import/scan/${scanId}`),
+  run: (scanId, edits = []) => request('/import/run', { 
     method: 'POST',
-    body: JSON.stringify({ edits }),
+    body: JSON.stringify({ scan_id: scanId, edits }),
   }),
-  getReport: () => request('/import/report'),
+  getReport: (scanId) => request(scanId ? `/import/report?scan_id=${scanId}` : '/import/report'),
 };
 
 // Session endpoints
@@ -2,6 +2,10 @@ import { useState, useEffect } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { importApi } from '../api/client'
 
+// Scans are polled once a second; give up after 10 minutes
+const SCAN_POLL_INTERVAL_MS = 1000
+const MAX_SCAN_POLLS = 600
+
 function ImportWizard({ onComplete }) {
   const [step, setStep] = useState('check') // check, scan, review, importing, done
   const [status, setStatus] = useState(null)
@@ -32,7 +36,19 @@ function ImportWizard({ onComplete }) {
     setStep('scanning')
     setError(null)
     try {
-      const result = await importApi.scan()
+      let result = await importApi.scan()
+      // New PDFs are parsed in the background; poll until the scan finishes
+      let polls = 0
+      while (result.status === 'running') {
+        if (++polls > MAX_SCAN_POLLS) {
+          throw new Error('Scan is taking too long - try again later')
+        }
+        await new Promise((resolve) => setTimeout(resolve, SCAN_POLL_INTERVAL_MS))
+        result = await importApi.getScan(result.scan_id)
+      }
+      if (result.status === 'error') {
+        throw new Error(result.error || 'Scan failed')
+      }
       setScanResult(result)
       setStep('review')
     } catch (err) {
@@ -45,7 +61,7 @@ function ImportWizard({ onComplete }) {
     setImporting(true)
     setError(null)
     try {
-      const result = await importApi.run([])
+      const result = await importApi.run(scanResult?.scan_id, [])
       setStep('done')
       onComplete?.()
     } catch (err) {
@@ -2,18 +2,36 @@
 """Migrate questions from local SQLite to Railway PostgreSQL."""
 import os
 import sys
-import json
 import sqlite3
 
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import column, create_engine, insert, table, text
 
 # Local SQLite database
 LOCAL_DB = os.path.join(os.path.dirname(__file__), '..', 'data', 'az104.db')
 
+# Rows read from SQLite and inserted per batch
+BATCH_SIZE = 1000
+
+
+def copy_rows(sqlite_conn, query: str, to_row, conn, target) -> int:
+    """Stream query results into target in batches; returns the row count.
+    
+    Only one batch is held in memory, and PostgreSQL receives rows while
+    SQLite is still being read.
+    """
+    cursor = sqlite_conn.execute(query)
+    total = 0
+    while True:
+        batch = [to_row(r) for r in cursor.fetchmany(BATCH_SIZE)]
+        if not batch:
+            return total
+        conn.execute(insert(target), batch)
+        total += len(batch)
+
+
 def migrate(postgres_url: str):
     """Migrate data from local SQLite to PostgreSQL."""
     print(f"Connecting to local SQLite: {LOCAL_DB}")
@@ -24,11 +42,53 @@ def migrate(postgres_url: str):
     
     # Connect to PostgreSQL
     print(f"Connecting to PostgreSQL...")
-    pg_engine = create_engine(postgres_url)
+    # TCP keepalives so the proxy doesn't drop the connection mid-transaction
+    pg_engine = create_engine(postgres_url, connect_args={"keepalives": 1, "keepalives_idle": 30})
     
-    # Create tables in PostgreSQL
-    print("Creating tables...")
-    with pg_engine.connect() as conn:
+    # Core insert() constructs (not text()) so SQLAlchemy batches the rows into
+    # multi-row INSERT ... VALUES statements instead of one round-trip per row
+    questions_table = table(
+        "questions",
+        *(column(name) for name in (
+            "stable_id", "text", "choices", "choice_count", "correct_answers", "explanation",
+            "question_type", "domain_id", "source_file", "source_page",
+            "exhibit_image", "series_id", "sequence_number",
+            "times_shown", "times_correct",
+        )),
+    )
+    domain_stats_table = table(
+        "domain_stats",
+        *(column(name) for name in (
+            "domain_id", "domain_name", "total_questions", "total_shown", "total_correct",
+        )),
+    )
+    
+    # Rows come out of SQLite already shaped for the insert: JSON columns are
+    # stored as TEXT, so choices/correct_answers are bound as-is without a
+    # json.dumps round trip, and COALESCE fills the counter defaults.
+    # choice_count is derived from choices, so it is right even for local
+    # databases that predate the column or were never backfilled
+    questions_query = """
+        SELECT stable_id, text, choices, json_array_length(choices) AS choice_count,
+               correct_answers, explanation,
+               question_type, domain_id, source_file, source_page,
+               exhibit_image, series_id, sequence_number,
+               COALESCE(times_shown, 0) AS times_shown,
+               COALESCE(times_correct, 0) AS times_correct
+        FROM questions
+    """
+    stats_query = """
+        SELECT domain_id, domain_name,
+               COALESCE(total_questions, 0) AS total_questions,
+               COALESCE(total_shown, 0) AS total_shown,
+               COALESCE(total_correct, 0) AS total_correct
+        FROM domain_stats
+    """
+    
+    # One transaction for schema and data: the migration is all or nothing
+    with pg_engine.begin() as conn:
+        # Create tables in PostgreSQL
+        print("Creating tables...")
         conn.execute(text("""
             CREATE TABLE IF NOT EXISTS users (
                 id SERIAL PRIMARY KEY,
@@ -45,6 +105,7 @@ def migrate(postgres_url: str):
                 stable_id VARCHAR(64) UNIQUE,
                 text TEXT NOT NULL,
                 choices JSON NOT NULL,
+                choice_count INTEGER,
                 correct_answers JSON NOT NULL,
                 explanation TEXT,
                 question_type VARCHAR(20) DEFAULT 'single',
@@ -103,81 +164,28 @@ def migrate(postgres_url: str):
             )
         """))
         
+        # Tables created before choice_count existed; session selectors filter on it
+        conn.execute(text("ALTER TABLE questions ADD COLUMN IF NOT EXISTS choice_count INTEGER"))
+        
         # Create indexes
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_stable_id ON questions(stable_id)"))
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_domain_id ON questions(domain_id)"))
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_series_id ON questions(series_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_choice_count ON questions(choice_count)"))
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_exam_sessions_user_id ON exam_sessions(user_id)"))
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_users_email ON users(email)"))
         
-        conn.commit()
-    
-    # Migrate questions
-    print("Migrating questions...")
-    cursor = sqlite_conn.execute("SELECT * FROM questions")
-    questions = cursor.fetchall()
-    
-    with pg_engine.connect() as conn:
-        # Clear existing questions
+        # Migrate questions
+        print("Migrating questions...")
         conn.execute(text("DELETE FROM questions"))
+        count = copy_rows(sqlite_conn, questions_query, dict, conn, questions_table)
+        print(f"✅ Migrated {count} questions!")
         
-        for q in questions:
-            conn.execute(text("""
-                INSERT INTO questions (
-                    stable_id, text, choices, correct_answers, explanation,
-                    question_type, domain_id, source_file, source_page,
-                    exhibit_image, series_id, sequence_number,
-                    times_shown, times_correct
-                ) VALUES (
-                    :stable_id, :text, :choices, :correct_answers, :explanation,
-                    :question_type, :domain_id, :source_file, :source_page,
-                    :exhibit_image, :series_id, :sequence_number,
-                    :times_shown, :times_correct
-                )
-            """), {
-                'stable_id': q['stable_id'],
-                'text': q['text'],
-                'choices': q['choices'] if isinstance(q['choices'], str) else json.dumps(q['choices']),
-                'correct_answers': q['correct_answers'] if isinstance(q['correct_answers'], str) else json.dumps(q['correct_answers']),
-                'explanation': q['explanation'],
-                'question_type': q['question_type'],
-                'domain_id': q['domain_id'],
-                'source_file': q['source_file'],
-                'source_page': q['source_page'],
-                'exhibit_image': q['exhibit_image'],
-                'series_id': q['series_id'],
-                'sequence_number': q['sequence_number'],
-                'times_shown': q['times_shown'] or 0,
-                'times_correct': q['times_correct'] or 0,
-            })
-        
-        conn.commit()
-    
-    print(f"✅ Migrated {len(questions)} questions!")
-    
-    # Migrate domain stats
-    print("Migrating domain stats...")
-    cursor = sqlite_conn.execute("SELECT * FROM domain_stats")
-    stats = cursor.fetchall()
-    
-    with pg_engine.connect() as conn:
+        # Migrate domain stats
+        print("Migrating domain stats...")
         conn.execute(text("DELETE FROM domain_stats"))
-        
-        for s in stats:
-            conn.execute(text("""
-                INSERT INTO domain_stats (domain_id, domain_name, total_questions, total_shown, total_correct)
-                VALUES (:domain_id, :domain_name, :total_questions, :total_shown, :total_correct)
-            """), {
-                'domain_id': s['domain_id'],
-                'domain_name': s['domain_name'],
-                'total_questions': s['total_questions'] or 0,
-                'total_shown': s['total_shown'] or 0,
-                'total_correct': s['total_correct'] or 0,
-            })
-        
-        conn.commit()
-    
-    print(f"✅ Migrated {len(stats)} domain stats!")
+        count = copy_rows(sqlite_conn, stats_query, dict, conn, domain_stats_table)
+        print(f"✅ Migrated {count} domain stats!")
     
     sqlite_conn.close()
     print("\n🎉 Migration complete!")
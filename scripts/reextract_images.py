@@ -2,50 +2,123 @@
 """Re-extract exhibit images and update database without losing question data."""
 
 import sys
-import os
-import re
-import hashlib
+import argparse
+import queue
+import threading
+from bisect import bisect_right
 from pathlib import Path
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backend.app.config import PDFS_DIR, EXHIBITS_DIR, DATABASE_URL
+from sqlalchemy import update
+
+from backend.app.config import PDFS_DIR, EXHIBITS_DIR, ensure_dirs
 from backend.app.database import SessionLocal
 from backend.app.models import Question
+from backend.app.services.parser import PDFParser, score_exhibit_image
 
 import fitz  # PyMuPDF
 
 
+# Keywords that indicate exhibit/table needed
+EXHIBIT_KEYWORDS = (
+    "exhibit", "shown in the following", "as shown in",
+    "following diagram", "following image", "shown below"
+)
+TABLE_KEYWORDS = (
+    "following users", "following resources", "following table",
+    "following virtual machines", "following storage accounts",
+    "following subscriptions", "contains the following",
+    "following information", "following configuration",
+    "following azure", "following settings"
+)
+# Every keyword above contains one of these, so texts without any skip both scans
+HINT_WORDS = ("exhibit", "following", "shown")
+# Keywords that make a table-like image the preferred exhibit
+EXPECTS_TABLE_KEYWORDS = (
+    "following users", "following resources", "following table",
+    "following virtual machines", "following storage accounts",
+    "following subscriptions", "contains the following",
+    "shown in the following", "contains the resources shown", "following locations"
+)
+
+
 def normalize_text(text: str) -> str:
     """Normalize whitespace for matching."""
-    return re.sub(r'\s+', ' ', text.lower()).strip()
+    # Same result as collapsing \s+ runs and stripping, without the regex
+    return " ".join(text.lower().split())
 
 
-def find_pdf_page_for_question(question_text: str, doc) -> int:
-    """Find the actual PDF page containing this question text."""
-    # Use first 150-200 chars for matching
-    search_text = normalize_text(question_text[:180])
+def load_page_texts(doc) -> tuple:
+    """Normalize every page's text once and join the pages for lookups.
     
-    for page_num in range(len(doc)):
-        page = doc[page_num]
+    Returns (starts, joined): the pages joined with NUL and each page's
+    offset in joined. Question text never contains NUL, so a match can't
+    span two pages.
+    """
+    starts = []
+    pages = []
+    offset = 0
+    for page in doc:
         page_text = normalize_text(page.get_text("text"))
-        if search_text in page_text:
-            return page_num + 1  # 1-indexed
+        starts.append(offset)
+        pages.append(page_text)
+        offset += len(page_text) + 1
+    return starts, "\0".join(pages)
+
+
+def find_pdf_page_for_question(question_text: str, page_texts: tuple, hint_page: int = 0) -> int:
+    """Find the actual PDF page containing this question text.
     
-    # Try shorter match
-    search_text = normalize_text(question_text[:100])
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        page_text = normalize_text(page.get_text("text"))
-        if search_text in page_text:
-            return page_num + 1
+    hint_page (1-indexed, e.g. the previous question's page) is searched
+    first, from the page before it to two pages after; the whole document
+    is only scanned when the text isn't there.
+    """
+    starts, joined = page_texts
+    window = None
+    if hint_page:
+        lo = starts[min(max(hint_page - 2, 0), len(starts) - 1)]
+        hi = starts[hint_page + 2] if hint_page + 2 < len(starts) else len(joined)
+        window = (lo, hi)
+    # Use first 150-200 chars for matching, then try a shorter match
+    for length in (180, 100):
+        needle = normalize_text(question_text[:length])
+        pos = joined.find(needle, *window) if window else -1
+        if pos == -1:
+            pos = joined.find(needle)
+        if pos != -1:
+            return bisect_right(starts, pos)  # 1-indexed
     
     return 0
 
 
-def extract_image_for_question(doc, pdf_page_num: int, question: Question) -> str:
-    """Extract the best image from surrounding pages using a scoring heuristic."""
+def image_writer(writes: queue.Queue, failed: set):
+    """Write queued (filepath, bytes) pairs until a None sentinel arrives.
+    
+    Names of files that couldn't be written are added to failed, so their
+    paths are not committed.
+    """
+    while True:
+        item = writes.get()
+        if item is None:
+            return
+        filepath, image_bytes = item
+        try:
+            filepath.write_bytes(image_bytes)
+        except OSError as e:
+            print(f"  Error writing {filepath.name}: {e}")
+            failed.add(filepath.name)
+
+
+def extract_image_for_question(doc, pdf_page_num: int, question: Question, image_info: dict, page_images: dict, writes: queue.Queue) -> str:
+    """Extract the best image from surrounding pages using a scoring heuristic.
+    
+    Neighbouring questions share candidate pages, so page_images caches each
+    page's get_images() list and image_info caches (ext, width, height, size)
+    per xref; an image is only decoded again when it is the one saved.
+    The bytes are handed to the writer thread through writes.
+    """
     if pdf_page_num < 1:
         return None
 
@@ -57,48 +130,39 @@ def extract_image_for_question(doc, pdf_page_num: int, question: Question) -> st
         pages_to_try.append(pdf_page_num)  # next page
 
     q_text_lower = question.text.lower()
-    expects_table = any(kw in q_text_lower for kw in [
-        "following users", "following resources", "following table",
-        "following virtual machines", "following storage accounts",
-        "following subscriptions", "contains the following",
-        "shown in the following", "contains the resources shown", "following locations"
-    ])
+    expects_table = any(kw in q_text_lower for kw in EXPECTS_TABLE_KEYWORDS)
 
-    best = None  # (score, bytes, ext, width, height, page_idx, img_index)
+    best = None  # (score, xref, ext, width, height, page_idx, img_index)
 
     for page_idx in sorted(set(pages_to_try)):
         if page_idx < 0 or page_idx >= len(doc):
             continue
-        page = doc[page_idx]
-        image_list = page.get_images(full=True)
+        image_list = page_images.get(page_idx)
+        if image_list is None:
+            image_list = page_images[page_idx] = doc[page_idx].get_images(full=True)
         for img_index, img in enumerate(image_list):
             xref = img[0]
             try:
-                base_image = doc.extract_image(xref)
-                image_bytes = base_image["image"]
-                image_ext = base_image["ext"]
-                width = base_image.get("width", 0)
-                height = base_image.get("height", 0)
-                size = len(image_bytes)
+                info = image_info.get(xref)
+                if info is None:
+                    base_image = doc.extract_image(xref)
+                    info = image_info[xref] = (
+                        base_image["ext"],
+                        base_image.get("width", 0),
+                        base_image.get("height", 0),
+                        len(base_image["image"]),
+                    )
+                image_ext, width, height, size = info
 
                 # Skip tiny icons
-                if size < 5000:
+                if size < PDFParser.MIN_IMAGE_BYTES:
                     continue
 
-                # Table-like images (wide and short)
-                is_table_like = width > 300 and height > 50 and width / max(height, 1) > 1.5
-
-                # Scoring: prefer table-like if expected, otherwise largest
-                score = size / 10000.0
-                if expects_table and is_table_like:
-                    score += 5.0
-                elif is_table_like:
-                    score += 1.0
-                if page_idx == pdf_page_num - 1:
-                    score += 0.5
+                # Same scoring as the importer: table-like if expected, otherwise largest
+                score = score_exhibit_image(size, width, height, expects_table, page_idx == pdf_page_num - 1)
 
                 if not best or score > best[0]:
-                    best = (score, image_bytes, image_ext, width, height, page_idx, img_index)
+                    best = (score, xref, image_ext, width, height, page_idx, img_index)
             except Exception as e:
                 print(f"  Error extracting image: {e}")
                 continue
@@ -106,21 +170,28 @@ def extract_image_for_question(doc, pdf_page_num: int, question: Question) -> st
     if not best:
         return None
 
-    _, image_bytes, image_ext, width, height, page_idx, img_index = best
+    _, xref, image_ext, width, height, page_idx, img_index = best
     stable_suffix = question.stable_id[:8] if question.stable_id else str(question.id)
     filename = f"q{question.source_page}_{stable_suffix}_img{page_idx}_{img_index}.{image_ext}"
     filepath = EXHIBITS_DIR / filename
 
-    with open(filepath, "wb") as f:
-        f.write(image_bytes)
+    writes.put((filepath, doc.extract_image(xref)["image"]))
 
     return f"/static/exhibits/{filename}"
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--skip-existing", action="store_true",
+        help="leave questions alone whose exhibit file already exists (incremental refresh)",
+    )
+    args = parser.parse_args()
+    
     print("Re-extracting exhibit images...")
     print(f"PDF directory: {PDFS_DIR}")
     print(f"Exhibits directory: {EXHIBITS_DIR}")
+    ensure_dirs()
     
     # Find PDF
     pdf_files = list(PDFS_DIR.glob("*.pdf"))
@@ -134,65 +205,79 @@ def main():
     # Open PDF
     doc = fitz.open(pdf_path)
     print(f"PDF has {len(doc)} pages")
-    
-    # Keywords that indicate exhibit/table needed
-    exhibit_keywords = [
-        "following exhibit", "shown in the following", "as shown in",
-        "following diagram", "following image", "exhibit", "shown below"
-    ]
-    table_keywords = [
-        "following users", "following resources", "following table",
-        "following virtual machines", "following storage accounts",
-        "following subscriptions", "contains the following",
-        "following information", "following configuration",
-        "following azure", "following settings"
-    ]
+    page_texts = load_page_texts(doc)
     
     # Get questions from database
     db = SessionLocal()
-    questions = db.query(Question).all()
+    # Import order follows the PDF, so each question's page hints the next
+    questions = db.query(Question).order_by(Question.id).all()
     print(f"Found {len(questions)} questions in database")
     
-    updated = 0
+    updates = []  # [{"id": ..., "exhibit_image": ...}] applied in one executemany
     errors = 0
+    skipped = 0
+    image_info = {}
+    page_images = {}
+    last_page = 0
+    # One directory listing instead of a stat per question
+    existing = {p.name for p in EXHIBITS_DIR.iterdir()} if args.skip_existing else set()
+    # File writes release the GIL, so they overlap with the next decode
+    writes = queue.Queue()
+    failed_writes = set()
+    writer = threading.Thread(target=image_writer, args=(writes, failed_writes), daemon=True)
+    writer.start()
     
     for q in questions:
         q_text_lower = q.text.lower()
-        has_exhibit = any(kw in q_text_lower for kw in exhibit_keywords)
-        has_table = any(kw in q_text_lower for kw in table_keywords)
-        
-        if not has_exhibit and not has_table:
+        if not any(word in q_text_lower for word in HINT_WORDS):
+            continue
+        if not (any(kw in q_text_lower for kw in EXHIBIT_KEYWORDS)
+                or any(kw in q_text_lower for kw in TABLE_KEYWORDS)):
+            continue
+        if q.exhibit_image and q.exhibit_image.rsplit("/", 1)[-1] in existing:
+            skipped += 1
             continue
         
         print(f"\nProcessing Q{q.source_page} (id={q.id})...")
         
         # Find the actual PDF page
-        pdf_page = find_pdf_page_for_question(q.text, doc)
+        pdf_page = find_pdf_page_for_question(q.text, page_texts, hint_page=last_page)
         if pdf_page == 0:
             print(f"  WARNING: Could not find PDF page for Q{q.source_page}")
             errors += 1
             continue
         
         print(f"  Found on PDF page {pdf_page}")
+        last_page = pdf_page
         
         # Extract image
-        new_image_path = extract_image_for_question(doc, pdf_page, q)
+        new_image_path = extract_image_for_question(doc, pdf_page, q, image_info, page_images, writes)
         
         if new_image_path:
-            old_path = q.exhibit_image
-            q.exhibit_image = new_image_path
-            print(f"  Image: {old_path} -> {new_image_path}")
-            updated += 1
+            print(f"  Image: {q.exhibit_image} -> {new_image_path}")
+            updates.append({"id": q.id, "exhibit_image": new_image_path})
         else:
             print(f"  No suitable image found")
     
-    # Commit changes
+    # Every image is on disk before the new paths are committed; questions
+    # whose file failed to write keep their old path
+    writes.put(None)
+    writer.join()
+    if failed_writes:
+        kept = [u for u in updates if u["exhibit_image"].rsplit("/", 1)[-1] not in failed_writes]
+        errors += len(updates) - len(kept)
+        updates = kept
+    
+    # Commit changes: ORM bulk UPDATE by primary key, one executemany
+    if updates:
+        db.execute(update(Question), updates)
     db.commit()
     db.close()
     doc.close()
     
     print(f"\n=== Summary ===")
-    print(f"Updated: {updated} questions")
+    print(f"Updated: {len(updates)} questions")
+    print(f"Skipped (image exists): {skipped} questions")
     print(f"Errors: {errors} questions")
     print("Done!")
 
@@ -2,7 +2,6 @@
 """Update exhibit_image paths in Railway PostgreSQL to match new filenames."""
 
 import sys
-import os
 from pathlib import Path
 
 # Get Railway PostgreSQL URL from command line
@@ -13,9 +12,25 @@ if len(sys.argv) < 2:
 RAILWAY_URL = sys.argv[1]
 
 # Connect to Railway PostgreSQL
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, select, text
 
-engine = create_engine(RAILWAY_URL)
+# One-shot script: a single connection, kept alive across the Railway proxy
+engine = create_engine(RAILWAY_URL, connect_args={"keepalives": 1, "keepalives_idle": 30})
+
+# Rows sent per UPDATE statement
+BATCH_SIZE = 1000
+
+SYNC_IMAGES = text("""
+    WITH changed AS (
+        UPDATE questions q SET exhibit_image = data.img
+        FROM unnest(CAST(:sids AS text[]), CAST(:imgs AS text[])) AS data(sid, img)
+        WHERE q.stable_id = data.sid
+          AND q.exhibit_image IS DISTINCT FROM data.img
+        RETURNING data.img IS NULL AS is_cleared
+    )
+    SELECT count(*) FILTER (WHERE NOT is_cleared), count(*) FILTER (WHERE is_cleared)
+    FROM changed
+""")
 
 # Get mapping from local SQLite
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -23,36 +38,37 @@ from backend.app.database import SessionLocal
 from backend.app.models import Question
 
 local_db = SessionLocal()
-# Split local rows into with-image and without-image (NULL)
-with_image = local_db.query(Question).filter(Question.exhibit_image.isnot(None)).all()
-without_image = local_db.query(Question).filter(Question.exhibit_image.is_(None)).all()
-
-print(f"Found {len(with_image)} questions with images in local DB")
-print(f"Found {len(without_image)} questions with NULL images in local DB")
-
-# Update Railway
-with engine.connect() as conn:
-    updated = 0
-    cleared = 0
-    for q in with_image:
-        # Update by stable_id to match questions across databases
-        result = conn.execute(
-            text("UPDATE questions SET exhibit_image = :img WHERE stable_id = :sid"),
-            {"img": q.exhibit_image, "sid": q.stable_id}
-        )
-        if result.rowcount > 0:
-            updated += 1
-
-    # Clear images where local is NULL
-    for q in without_image:
-        result = conn.execute(
-            text("UPDATE questions SET exhibit_image = NULL WHERE stable_id = :sid"),
-            {"sid": q.stable_id}
-        )
-        if result.rowcount > 0:
-            cleared += 1
-    conn.commit()
+# stable_id / exhibit_image for every local row, streamed straight into the
+# two arrays the remote UPDATE binds; NULL images clear the remote path.
+# Rows without a stable_id can't be matched remotely, so they aren't sent.
+sids = []
+imgs = []
+stmt = select(Question.stable_id, Question.exhibit_image).where(Question.stable_id.isnot(None))
+for sid, img in local_db.execute(stmt).yield_per(BATCH_SIZE):
+    sids.append(sid)
+    imgs.append(img)
+# Local reads are done; don't hold the SQLite connection during the remote update
+local_db.close()
+with_image = len(imgs) - imgs.count(None)
+
+print(f"Found {with_image} questions with images in local DB")
+print(f"Found {len(imgs) - with_image} questions with NULL images in local DB")
+
+# Update Railway: each UPDATE joins a batch of local rows, matched by
+# stable_id across databases, instead of a round trip per question. Rows that
+# already match are skipped, so re-runs only write (and count) real changes.
+# One transaction: begin() commits on success and rolls back if any batch fails.
+with engine.begin() as conn:
+    updated = cleared = 0
+    # Bounded batches keep each statement's array literals a manageable size
+    for i in range(0, len(sids), BATCH_SIZE):
+        # The counts are taken server-side, so one row comes back per batch
+        batch_updated, batch_cleared = conn.execute(
+            SYNC_IMAGES,
+            {"sids": sids[i:i + BATCH_SIZE], "imgs": imgs[i:i + BATCH_SIZE]}
+        ).one()
+        updated += batch_updated
+        cleared += batch_cleared
     print(f"Updated {updated} and cleared {cleared} questions in Railway PostgreSQL")
 
-local_db.close()
 print("Done!")